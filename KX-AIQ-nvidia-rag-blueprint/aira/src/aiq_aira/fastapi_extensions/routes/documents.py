@@ -15,6 +15,7 @@
 
 import json
 import logging
+import re
 from typing import Any
 from typing import Dict
 from typing import List
@@ -42,6 +43,8 @@ ALLOWED_MIME_TYPES = {
     'application/rtf',
     'text/markdown'
 }
+# Characters stripped from uploaded filenames: anything but word chars, whitespace, dots and hyphens
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\s.-]')
 
 
 def sanitize_filename(filename: str) -> str:
@@ -54,8 +57,7 @@ def sanitize_filename(filename: str) -> str:
         raise HTTPException(status_code=400, detail="Invalid filename: path traversal detected")
     
     # Remove dangerous characters, keep alphanumeric, spaces, dots, hyphens, underscores
-    import re
-    safe_name = re.sub(r'[^\w\s.-]', '', safe_name)
+    safe_name = UNSAFE_FILENAME_CHARS.sub('', safe_name)
     
     # Prevent hidden files
     if safe_name.startswith('.'):
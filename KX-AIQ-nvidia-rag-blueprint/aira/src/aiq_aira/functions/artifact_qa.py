@@ -31,6 +31,7 @@ from aiq_aira.schema import (
 
 from aiq_aira.artifact_utils import artifact_chat_handler, check_relevant
 from aiq_aira.nodes import process_single_query, deduplicate_and_format_sources
+from aiq_aira.search_utils import close_rag_sessions
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,8 @@ class ArtifactQAConfig(FunctionBaseConfig, name="artifact_qa"):
     """
     llm_name: LLMRef = "instruct_llm"
     rag_url: str = ""
+    # Start the web search while relevancy is checked instead of after it (extra Tavily calls)
+    speculative_web_search: bool = False
 
 
 @register_function(config_type=ArtifactQAConfig)
@@ -137,7 +140,8 @@ async def artifact_qa_fn(config: ArtifactQAConfig, aiq_builder: Builder):
             writer=writer,
             collection=query_message.rag_collection,
             llm=llm,
-            search_web=query_message.use_internet
+            search_web=query_message.use_internet,
+            speculative_web=config.speculative_web_search
         )
 
         gen_query = GeneratedQuery(
@@ -202,7 +206,8 @@ async def artifact_qa_fn(config: ArtifactQAConfig, aiq_builder: Builder):
             writer=writer,
             collection=query_message.rag_collection,
             llm=llm,
-            search_web=query_message.use_internet
+            search_web=query_message.use_internet,
+            speculative_web=config.speculative_web_search
         )
 
         gen_query = GeneratedQuery(
@@ -217,8 +222,12 @@ async def artifact_qa_fn(config: ArtifactQAConfig, aiq_builder: Builder):
 
         yield await artifact_chat_handler(llm, query_message)
 
-    yield FunctionInfo.create(
-        single_fn=_artifact_qa,
-        stream_fn=_artifact_qa_streaming,
-        description="Chat-based Q&A about a previously generated artifact, optionally doing additional RAG lookups."
-    )
+    try:
+        yield FunctionInfo.create(
+            single_fn=_artifact_qa,
+            stream_fn=_artifact_qa_streaming,
+            description="Chat-based Q&A about a previously generated artifact, optionally doing additional RAG lookups."
+        )
+    finally:
+        # Release the pooled RAG connections on workflow shutdown
+        await close_rag_sessions()
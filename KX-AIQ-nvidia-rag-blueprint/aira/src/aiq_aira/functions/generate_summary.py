@@ -37,6 +37,7 @@ from aiq_aira.schema import AIRAState
 from aiq_aira.schema import ConfigSchema
 from aiq_aira.schema import GenerateSummaryStateInput
 from aiq_aira.schema import GenerateSummaryStateOutput
+from aiq_aira.search_utils import close_rag_sessions
 from langchain_core.runnables import RunnableConfig
 
 def serialize_pydantic(obj):
@@ -56,6 +57,8 @@ class AIRAGenerateSummaryConfig(FunctionBaseConfig, name="generate_summaries"):
     Configuration for the generate_summary function/endpoint
     """
     rag_url: str = ""
+    # Start the web search while relevancy is checked instead of after it (extra Tavily calls)
+    speculative_web_search: bool = False
 
 def serialize_pydantic(obj):
     if isinstance(obj, list):
@@ -117,6 +120,7 @@ async def generate_summary_fn(config: AIRAGenerateSummaryConfig, aiq_builder: Bu
                                                       "num_reflections": message.reflection_count,
                                                       "topic": message.topic,
                                                       "use_kdb": message.use_kdb,  # None = legacy auto-detect
+                                                      "speculative_web": config.speculative_web_search,
                                                   })
         return GenerateSummaryStateOutput(final_report=response["final_report"], citations=response["citations"])
 
@@ -144,6 +148,7 @@ async def generate_summary_fn(config: AIRAGenerateSummaryConfig, aiq_builder: Bu
                     "search_web": message.search_web,
                     "num_reflections": message.reflection_count,
                     "use_kdb": message.use_kdb,  # None = legacy auto-detect
+                    "speculative_web": config.speculative_web_search,
                 }
         ):
 
@@ -157,8 +162,12 @@ async def generate_summary_fn(config: AIRAGenerateSummaryConfig, aiq_builder: Bu
 
 
     # Instead of from_fn(...), provide both single & stream versions:
-    yield FunctionInfo.create(
-        single_fn=_generate_summary_single,
-        stream_fn=_generate_summary_stream,
-        description="Generates a full report (Stage 2) by doing web research, summarizing, reflecting, and finalizing the report (supports streaming)."
-    )
+    try:
+        yield FunctionInfo.create(
+            single_fn=_generate_summary_single,
+            stream_fn=_generate_summary_stream,
+            description="Generates a full report (Stage 2) by doing web research, summarizing, reflecting, and finalizing the report (supports streaming)."
+        )
+    finally:
+        # Release the pooled RAG connections on workflow shutdown
+        await close_rag_sessions()
@@ -25,11 +25,19 @@ Usage:
     Falls back to kdb_tools.py when the MCP client is unavailable.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
 import os
-from typing import Any, Optional
-
+import re
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+
+import orjson
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langgraph.types import StreamWriter
 
@@ -40,6 +48,90 @@ KDB_ENABLED = os.getenv("KDB_ENABLED", "false").lower() == "true"
 KDB_USE_NAT_CLIENT = os.getenv("KDB_USE_NAT_CLIENT", "true").lower() == "true"
 KDB_MCP_ENDPOINT = os.getenv("KDB_MCP_ENDPOINT", "https://kdbxmcp.kxailab.com/mcp")
 KDB_TIMEOUT = int(os.getenv("KDB_TIMEOUT", "30"))
+KDB_LLM_CACHE_SIZE = int(os.getenv("KDB_LLM_CACHE_SIZE", "256"))
+KDB_LLM_MAX_CONCURRENCY = int(os.getenv("KDB_LLM_MAX_CONCURRENCY", "8"))
+
+# Patterns for cleaning LLM responses (compiled once, used on every response parse)
+_THINK_RE = re.compile(r'<think>[\s\S]*?</think>', re.IGNORECASE)
+_THINK_OPEN_RE = re.compile(r'<think>[\s\S]*$', re.IGNORECASE)  # Unclosed think tag
+_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*(\{[\s\S]*\})\s*```')
+# Structural characters for brace matching; escape pairs are consumed as one token so
+# an escaped quote never toggles string state. The regex engine skips everything else.
+_JSON_TOKEN_RE = re.compile(r'\\.|[{}"]', re.DOTALL)
+_BRACE_RE = re.compile(r'[{}]')
+_SELECT_RE = re.compile(r'SELECT\s+.+', re.IGNORECASE | re.DOTALL)
+# Markdown fences and JSON-escaped quotes (\" or \') in generated SQL, removed in one pass
+_SQL_CLEAN_RE = re.compile(r'```(?:sql)?|\\(["\'])')
+_SQL_PATTERNS = [
+    re.compile(r'SELECT\s+[\s\S]+?(?:FROM|LIMIT)\s+\w+', re.IGNORECASE),  # SELECT ... FROM/LIMIT
+    re.compile(r'"query"\s*:\s*"([^"]+)"', re.IGNORECASE),  # "query": "..."
+    re.compile(r'`([^`]*SELECT[^`]*)`', re.IGNORECASE),  # `SELECT ...`
+    re.compile(r'query["\']?\s*[:=]\s*["\']([^"\']+)["\']', re.IGNORECASE),  # query: "..." or query='...'
+]
+
+
+def _json_loads(data: str | bytes) -> Any:
+    """
+    Parse JSON with orjson, falling back to the stdlib parser.
+
+    The fallback keeps inputs that only the stdlib accepts (NaN/Infinity
+    literals, integers wider than 64 bits) parsing as before. orjson's
+    JSONDecodeError subclasses json.JSONDecodeError, so callers catch either.
+    """
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize to JSON text with orjson, falling back to the stdlib serializer.
+
+    The fallback covers values orjson rejects (integers wider than 64 bits,
+    e.g. parsed by the _json_loads fallback); anything else it cannot encode
+    is written with str().
+    """
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+    except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+        return json.dumps(obj, indent=2 if indent else None, default=str)
+
+
+def _clean_generated_sql(text: str) -> str:
+    """
+    Remove markdown fences, JSON-escaped quotes and surrounding quotes from LLM-generated SQL.
+
+    Escaped quotes are unescaped before the surrounding quotes are stripped (the
+    LLM might return escaped strings, e.g. \\" -> "), so a query wrapped in
+    escaped quotes comes out bare rather than with a stray quote and backslash.
+    """
+    sql_query = _SQL_CLEAN_RE.sub(lambda m: m.group(1) or '', text)
+    return sql_query.strip().strip('"\'')
+
+
+def _iter_result_rows(result: dict):
+    """
+    Yield data rows from an MCP query result one content item at a time.
+
+    Each text item is decoded only when the caller asks for its rows, so callers
+    that need just the first row (column names, counts, date ranges) never parse
+    the remaining items. Items that are not valid JSON are skipped.
+    """
+    for item in result.get("content", []):
+        if not (isinstance(item, dict) and item.get("type") == "text"):
+            continue
+        try:
+            parsed = _json_loads(item.get("text", ""))
+            if not isinstance(parsed, dict):
+                continue
+            data = parsed.get("data", [])
+            if isinstance(data, str):
+                data = _json_loads(data)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if isinstance(data, list):
+            yield from data
 
 # Import MCP client from the mcp package (bundled with NAT 1.3.0+)
 # This is a hard requirement - NAT 1.3.0+ must be installed
@@ -66,6 +158,32 @@ KDB_KEYWORDS = [
     "profit", "loss", "sharpe", "drawdown", "var", "risk"
 ]
 
+# Query phrases that mark a schema/metadata question (answered from cached schema, no SQL)
+SCHEMA_QUESTION_KEYWORDS = [
+    "what table", "which table", "list table", "show table", "available table",
+    "what schema", "describe schema", "database schema", "what column"
+]
+
+# Plan step purposes that mark a schema discovery step
+SCHEMA_STEP_KEYWORDS = ["schema", "discover", "list tables", "describe", "metadata"]
+
+# MCP resources read to answer schema questions:
+# kdbx_describe_tables - lists tables and their columns
+# kdbx_sql_query_guidance - SQL syntax help
+_SCHEMA_RESOURCE_NAMES = frozenset({"kdbx_describe_tables", "kdbx_sql_query_guidance"})
+
+
+def _compile_keywords(keywords: list[str]) -> re.Pattern:
+    """Compile keywords into one alternation so a query is scanned once, not once per keyword."""
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
+_KDB_KEYWORDS_RE = _compile_keywords(KDB_KEYWORDS)
+# Single-word keywords for a whole-word fast path (a token hit implies a substring hit)
+_KDB_KEYWORD_TOKENS = frozenset(k for k in KDB_KEYWORDS if " " not in k)
+_SCHEMA_QUESTION_RE = _compile_keywords(SCHEMA_QUESTION_KEYWORDS)
+_SCHEMA_STEP_RE = _compile_keywords(SCHEMA_STEP_KEYWORDS)
+
 
 def is_kdb_query(query: str) -> bool:
     """
@@ -81,10 +199,15 @@ def is_kdb_query(query: str) -> bool:
         True if query appears to be financial/time-series related
     """
     query_lower = query.lower()
-    return any(keyword in query_lower for keyword in KDB_KEYWORDS)
+    if not _KDB_KEYWORD_TOKENS.isdisjoint(query_lower.split()):
+        return True
+    return _KDB_KEYWORDS_RE.search(query_lower) is not None
 
 
-# LLM prompt for intelligent tool selection and execution
+# LLM prompts for intelligent tool selection and execution.
+# The system prompt holds only content that is stable across queries (tools, schema,
+# data content, guidance, instructions) so OpenAI-compatible providers can reuse the
+# cached prompt prefix; per-query content goes in TOOL_SELECTION_USER_PROMPT.
 TOOL_SELECTION_PROMPT = """You are an intelligent data assistant with access to a KDB+ database via MCP (Model Context Protocol).
 
 ## Available MCP Tools:
@@ -102,9 +225,6 @@ TOOL_SELECTION_PROMPT = """You are an intelligent data assistant with access to
 ## Additional Resources from MCP Server:
 {additional_context}
 
-## User Query:
-{user_query}
-
 ## Your Task:
 You MUST use the available tools to answer the user's query. Follow these steps:
 
@@ -168,6 +288,10 @@ You MUST respond with ONLY a JSON object (no other text before or after):
 }}
 ```
 
+Steps run concurrently unless ordered. If a step needs an earlier step to finish first,
+add "depends_on": [index, ...] with the 0-based indices of those earlier steps.
+Omit "depends_on" for independent steps (e.g. separate SELECTs).
+
 If the requested data doesn't exist:
 ```json
 {{
@@ -230,6 +354,10 @@ CRITICAL RULES:
 6. Respond with ONLY the JSON object, no additional text"""
 
 
+TOOL_SELECTION_USER_PROMPT = """{additional_schema}## User Query:
+{user_query}"""
+
+
 RESULT_SYNTHESIS_PROMPT = """You are a helpful data assistant. Based on the following tool results, provide a clear and informative answer to the user's query.
 
 ## User Query:
@@ -247,6 +375,57 @@ RESULT_SYNTHESIS_PROMPT = """You are a helpful data assistant. Based on the foll
 Provide your response:"""
 
 
+# System prompt for single-shot SQL generation in simple_chat_query
+SIMPLE_CHAT_SQL_PROMPT = """Generate a SQL query for the user's question. Return ONLY the SQL, nothing else.
+
+Schema:
+{schema_description}
+
+Available Data (IMPORTANT - check this before querying):
+{data_content}
+
+IMPORTANT RULES:
+- ALWAYS quote column names with double quotes: SELECT "col1", "col2" FROM tablename
+- SQL reserved words MUST be quoted: "date", "time", "open", "close", "high", "low", "name", "type", "index"
+- Use ticker symbols for filtering, NOT company names
+- Check "Available values" above to verify the symbol exists BEFORE querying
+- Only use columns that exist in the schema
+- If searching text, search multiple text columns
+- DATE FILTERING: Do NOT use LIKE on date columns. Instead use:
+  * For year: EXTRACT(YEAR FROM "date") = 2023
+  * For month: EXTRACT(MONTH FROM "date") = 12
+  * For date range: "date" >= '2023-01-01' AND "date" <= '2023-12-31'
+  * For specific date: "date" = '2023-06-15'
+- ALWAYS close string literals with matching quotes: WHERE "sym" = 'AAPL' (not 'AAPL)"""
+
+
+class CachedTool(NamedTuple):
+    """
+    MCP tool metadata resolved once at initialization.
+
+    Tool objects returned by the MCP server are only read through a handful of
+    optional attributes, so they are resolved (and the description lower-cased)
+    up front instead of via getattr() on every prompt build or schema probe.
+    """
+    name: str
+    description: str
+    description_lc: str
+    input_schema: Optional[dict]
+    raw: Any
+
+    @classmethod
+    def from_tool(cls, tool: Any) -> "CachedTool":
+        """Build a CachedTool from a raw MCP tool object."""
+        description = getattr(tool, 'description', '') or ''
+        return cls(
+            name=tool.name,
+            description=description,
+            description_lc=description.lower(),
+            input_schema=getattr(tool, 'inputSchema', None),
+            raw=tool,
+        )
+
+
 class KDBNATClient:
     """
     Intelligent KDB+ MCP client using the mcp package (bundled with NAT 1.3.0+).
@@ -269,6 +448,11 @@ class KDBNATClient:
     DEFAULT_TABLE_FILTER_WORDS = ['table', 'tables', 'schema', 'column', 'columns',
                                   'type', 'description', 'example', 'name', 'the',
                                   'select', 'from', 'where', 'and', 'or', 'not']
+    # TTL (seconds) for cached tool plans (0 disables caching). Only plans are cached:
+    # synthesized and schema answers describe live KDB+ data and are always regenerated
+    PLAN_CACHE_TTL = 300
+    # Schema tool started alongside the first planning call (skipped if the server lacks it)
+    SPECULATIVE_SCHEMA_TOOL = "kdbx_describe_tables"
 
     def __init__(
         self,
@@ -281,7 +465,7 @@ class KDBNATClient:
     ):
         self.endpoint = endpoint
         self.timeout = timeout
-        self._tools: dict[str, Any] = {}
+        self._tools: dict[str, CachedTool] = {}
         self._tools_description: str = ""
         self._resources: list[dict] = []
         self._schema_description: str = ""
@@ -291,6 +475,23 @@ class KDBNATClient:
         # Data content discovery cache
         self._data_content: dict = {}  # {table: {symbols: [], date_range: {}, sample_content: {}}}
         self._data_content_discovered = False
+        # Background discovery started by initialize(), per event loop: a task can only be
+        # awaited from the loop that created it, and the global client outlives loops
+        self._data_content_tasks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task] = (
+            weakref.WeakKeyDictionary()
+        )
+        # Bumped whenever the schema, _additional_context or _data_content changes;
+        # invalidates the memoized prompt sections below
+        self._context_version = 0
+        self._formatted_context_cache: dict[str, tuple[int, str]] = {}
+        # LLM response cache: prompt digest -> (expiry, content), LRU ordered
+        self._llm_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # Caps in-flight LLM requests from concurrent queries sharing this client, per event loop
+        self._llm_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        # Default LLM reused across queries: (config key, client)
+        self._default_llm: Optional[tuple[tuple, ChatOpenAI]] = None
 
         # Configurable column detection patterns
         self.symbol_patterns = symbol_patterns or self.DEFAULT_SYMBOL_PATTERNS
@@ -298,6 +499,28 @@ class KDBNATClient:
         self.text_patterns = text_patterns or self.DEFAULT_TEXT_PATTERNS
         self.table_filter_words = table_filter_words or self.DEFAULT_TABLE_FILTER_WORDS
 
+    @staticmethod
+    def _for_running_loop(per_loop: weakref.WeakKeyDictionary, factory):
+        """
+        Return the running event loop's entry in ``per_loop``, creating it with ``factory``.
+
+        Entries for closed loops are dropped when a new entry is created.
+        """
+        loop = asyncio.get_running_loop()
+        value = per_loop.get(loop)
+        if value is None:
+            for stale_loop in [other for other in per_loop if other.is_closed()]:
+                del per_loop[stale_loop]
+            value = per_loop[loop] = factory()
+        return value
+
+    @property
+    def _llm_semaphore(self) -> asyncio.Semaphore:
+        """LLM concurrency semaphore for the running event loop."""
+        return self._for_running_loop(
+            self._llm_semaphores, lambda: asyncio.Semaphore(KDB_LLM_MAX_CONCURRENCY)
+        )
+
     async def _call_with_session(self, operation):
         """
         Execute an operation within an MCP session context.
@@ -315,6 +538,67 @@ class KDBNATClient:
                 # Execute the operation
                 return await operation(session)
 
+    async def _ainvoke(self, llm: ChatOpenAI, prompt: str | list[BaseMessage]) -> str:
+        """Invoke the LLM with at most KDB_LLM_MAX_CONCURRENCY requests in flight; returns the content."""
+        async with self._llm_semaphore:
+            response = await llm.ainvoke(prompt)
+        return response.content
+
+    async def _cached_ainvoke(
+        self,
+        llm: ChatOpenAI,
+        prompt: str | list[BaseMessage],
+        ttl: float,
+        cache_if: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        Invoke the LLM, reusing the response for an identical request within ``ttl``.
+
+        Responses are keyed on a blake2b digest of the model, endpoint, sampling
+        parameters and rendered prompt, and held in a bounded LRU
+        (KDB_LLM_CACHE_SIZE entries). Only successful responses are cached, and
+        only those accepted by ``cache_if`` when it is given.
+
+        Args:
+            llm: LLM instance to invoke on a cache miss
+            prompt: Fully rendered prompt, or a list of messages
+            ttl: Seconds to keep the response (0 disables caching)
+            cache_if: Optional predicate; a response it rejects is returned but not cached
+
+        Returns:
+            The response content
+        """
+        if ttl <= 0:
+            return await self._ainvoke(llm, prompt)
+
+        model = getattr(llm, "model_name", None) or getattr(llm, "model", "")
+        endpoint = getattr(llm, "openai_api_base", None) or getattr(llm, "base_url", None)
+        sampling = tuple(getattr(llm, name, None) for name in ("temperature", "top_p", "max_tokens"))
+        if isinstance(prompt, str):
+            prompt_text = prompt
+        else:
+            prompt_text = "\0".join(f"{m.type}:{m.content}" for m in prompt)
+        key = hashlib.blake2b(
+            f"{model}\0{endpoint}\0{sampling}\0{prompt_text}".encode(), digest_size=16
+        ).hexdigest()
+        now = time.monotonic()
+
+        cached = self._llm_cache.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                self._llm_cache.move_to_end(key)
+                logger.info(f"LLM response cache hit (key={key[:12]}, model={model})")
+                return cached[1]
+            del self._llm_cache[key]
+
+        content = await self._ainvoke(llm, prompt)
+        if cache_if is not None and not cache_if(content):
+            return content
+        self._llm_cache[key] = (now + ttl, content)
+        while len(self._llm_cache) > KDB_LLM_CACHE_SIZE:
+            self._llm_cache.popitem(last=False)
+        return content
+
     async def refresh_schema(self):
         """
         Refresh the schema by re-discovering tables from the MCP server.
@@ -325,6 +609,17 @@ class KDBNATClient:
         self._additional_context = {}
         self._data_content = {}
         self._data_content_discovered = False
+        # In-flight discovery would record content for the old schema; waiters re-discover
+        running_loop = asyncio.get_running_loop()
+        for loop, task in list(self._data_content_tasks.items()):
+            if task.done() or loop.is_closed():
+                continue
+            if loop is running_loop:
+                task.cancel()
+            else:
+                loop.call_soon_threadsafe(task.cancel)
+        self._data_content_tasks.clear()
+        self._context_version += 1
         await self._discover_schema()
         logger.info(f"Schema refreshed. Tables: {self._schema_description[:300] if self._schema_description else 'None'}...")
 
@@ -343,8 +638,6 @@ class KDBNATClient:
         if not self._schema_description:
             return tables_with_columns
 
-        import re
-
         # Pattern 1: Table with columns listed (common format from kdbx_describe_tables)
         # KDB-X MCP format: "TABLE ANALYSIS: tablename" followed by schema info
         # Example: "TABLE ANALYSIS: daily\n...\nSchema Information:\n  date | type=..."
@@ -566,98 +859,92 @@ class KDBNATClient:
                 logger.warning(f"Failed to discover content for table {table}: {e}")
 
         self._data_content_discovered = True
+        self._context_version += 1
         logger.info(f"=== Data content discovery complete ===")
         logger.info(f"Discovered tables: {list(self._data_content.keys())}")
         for table, info in self._data_content.items():
             logger.info(f"  {table}: {info.get('row_count', 'N/A')} rows, symbols={len(info.get('symbols', []))}, date_range={info.get('date_range', 'N/A')}")
         return self._data_content
 
+    def _start_data_content_discovery(self) -> asyncio.Task:
+        """Start discover_data_content() as a background task shared by callers on this loop."""
+        loop = asyncio.get_running_loop()
+        self._data_content_tasks.pop(loop, None)
+        task = self._for_running_loop(
+            self._data_content_tasks, lambda: asyncio.create_task(self.discover_data_content())
+        )
+        task.add_done_callback(lambda done: self._data_content_task_done(loop, done))
+        return task
+
+    def _data_content_task_done(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task):
+        """
+        Log a failed background discovery and forget the task so the next query retries.
+
+        Retrieving the exception here also keeps asyncio from reporting it as never
+        retrieved when no query was waiting on the task.
+        """
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.warning(f"Background data content discovery failed: {task.exception()}")
+        if self._data_content_tasks.get(loop) is task:
+            del self._data_content_tasks[loop]
+
+    async def _ensure_data_content(self):
+        """
+        Wait for data content discovery, starting it if no discovery is in flight.
+
+        Concurrent queries on the same event loop await the same task instead of each
+        running discovery; a task that finished without discovering content (e.g. it
+        failed) is retried. The task is shielded so a cancelled caller does not cancel
+        it for the others, and discovery is restarted if refresh_schema() cancelled it.
+        """
+        while True:
+            task = self._data_content_tasks.get(asyncio.get_running_loop())
+            if task is None or (task.done() and not self._data_content_discovered):
+                task = self._start_data_content_discovery()
+            try:
+                await asyncio.shield(task)
+                return
+            except asyncio.CancelledError:
+                if not task.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                logger.info("Data content discovery was cancelled by a schema refresh, restarting")
+
     def _extract_column_values(self, result: dict, column: str) -> list:
         """Extract values from a specific column in query results."""
         values = []
-        content = result.get("content", [])
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                try:
-                    text = item.get("text", "")
-                    parsed = json.loads(text)
-                    if isinstance(parsed, dict):
-                        data = parsed.get("data", [])
-                        if isinstance(data, str):
-                            data = json.loads(data)
-                        for row in data:
-                            if isinstance(row, dict) and column in row:
-                                val = row[column]
-                                if val and val not in values:
-                                    values.append(val)
-                except (json.JSONDecodeError, TypeError):
-                    pass
+        for row in _iter_result_rows(result):
+            if isinstance(row, dict) and column in row:
+                val = row[column]
+                if val and val not in values:
+                    values.append(val)
         return values
 
     def _extract_date_range(self, result: dict) -> dict:
         """Extract date range and row count from query results."""
-        content = result.get("content", [])
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                try:
-                    text = item.get("text", "")
-                    parsed = json.loads(text)
-                    if isinstance(parsed, dict):
-                        data = parsed.get("data", [])
-                        if isinstance(data, str):
-                            data = json.loads(data)
-                        if data and len(data) > 0:
-                            row = data[0]
-                            info = {}
-                            if "min_date" in row and "max_date" in row:
-                                info["date_range"] = {
-                                    "min": str(row["min_date"]),
-                                    "max": str(row["max_date"])
-                                }
-                            if "row_count" in row:
-                                info["row_count"] = row["row_count"]
-                            return info
-                except (json.JSONDecodeError, TypeError):
-                    pass
-        return {}
+        # Only the first row is needed; later content items are never decoded
+        row = next(_iter_result_rows(result), None)
+        if not isinstance(row, dict):
+            return {}
+        info = {}
+        if "min_date" in row and "max_date" in row:
+            info["date_range"] = {
+                "min": str(row["min_date"]),
+                "max": str(row["max_date"])
+            }
+        if "row_count" in row:
+            info["row_count"] = row["row_count"]
+        return info
 
     def _extract_columns_from_result(self, result: dict) -> list[str]:
         """Extract column names from a SELECT * query result."""
-        columns = []
-        content = result.get("content", [])
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                try:
-                    text = item.get("text", "")
-                    parsed = json.loads(text)
-                    if isinstance(parsed, dict):
-                        data = parsed.get("data", [])
-                        if isinstance(data, str):
-                            data = json.loads(data)
-                        if data and len(data) > 0 and isinstance(data[0], dict):
-                            columns = list(data[0].keys())
-                            return columns
-                except (json.JSONDecodeError, TypeError):
-                    pass
-        return columns
+        row = next(_iter_result_rows(result), None)
+        return list(row.keys()) if isinstance(row, dict) else []
 
     def _extract_single_value(self, result: dict, key: str):
         """Extract a single value from query results."""
-        content = result.get("content", [])
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                try:
-                    text = item.get("text", "")
-                    parsed = json.loads(text)
-                    if isinstance(parsed, dict):
-                        data = parsed.get("data", [])
-                        if isinstance(data, str):
-                            data = json.loads(data)
-                        if data and len(data) > 0 and isinstance(data[0], dict):
-                            return data[0].get(key)
-                except (json.JSONDecodeError, TypeError):
-                    pass
-        return None
+        row = next(_iter_result_rows(result), None)
+        return row.get(key) if isinstance(row, dict) else None
 
     async def _discover_tables_via_sql(self) -> list[str]:
         """
@@ -666,6 +953,7 @@ class KDBNATClient:
         Fallback when schema parsing doesn't find tables.
         """
         tables = []
+        seen = set()
 
         # Try common SQL patterns for listing tables
         discovery_queries = [
@@ -679,26 +967,19 @@ class KDBNATClient:
                 result = await self.call_tool("kdbx_run_sql_query", {"query": query})
                 if not result.get("error") and not result.get("isError"):
                     # Try to extract table names from various result formats
-                    content = result.get("content", [])
-                    for item in content:
-                        if isinstance(item, dict) and item.get("type") == "text":
-                            text = item.get("text", "")
-                            try:
-                                parsed = json.loads(text)
-                                if isinstance(parsed, dict):
-                                    data = parsed.get("data", [])
-                                    if isinstance(data, str):
-                                        data = json.loads(data)
-                                    for row in data:
-                                        if isinstance(row, dict):
-                                            # Try common column names for table names
-                                            for col in ['name', 'table_name', 'tablename', 'TABLE_NAME']:
-                                                if col in row and row[col]:
-                                                    tables.append(row[col])
-                                        elif isinstance(row, str):
-                                            tables.append(row)
-                            except (json.JSONDecodeError, TypeError):
-                                pass
+                    for row in _iter_result_rows(result):
+                        table = None
+                        if isinstance(row, dict):
+                            # Try common column names for table names (first match wins)
+                            for col in ('name', 'table_name', 'tablename', 'TABLE_NAME'):
+                                if row.get(col):
+                                    table = row[col]
+                                    break
+                        elif isinstance(row, str):
+                            table = row
+                        if table and table not in seen:
+                            seen.add(table)
+                            tables.append(table)
 
                     if tables:
                         logger.info(f"Discovered tables via SQL: {tables}")
@@ -716,6 +997,15 @@ class KDBNATClient:
         Returns:
             Formatted string describing available data for LLM context.
         """
+        cached = self._formatted_context_cache.get("data_content")
+        if cached and cached[0] == self._context_version:
+            return cached[1]
+        description = self._build_data_content_description()
+        self._formatted_context_cache["data_content"] = (self._context_version, description)
+        return description
+
+    def _build_data_content_description(self) -> str:
+        """Build the data content description (uncached)."""
         if not self._data_content:
             return "No data content discovered yet. Run discover_data_content() first."
 
@@ -778,7 +1068,7 @@ class KDBNATClient:
                 return result.tools if hasattr(result, 'tools') else result
 
             tools = await self._call_with_session(_init_tools)
-            self._tools = {tool.name: tool for tool in tools}
+            self._tools = {tool.name: CachedTool.from_tool(tool) for tool in tools}
 
             # Build a comprehensive tools description for the LLM
             self._tools_description = self._build_tools_description()
@@ -793,6 +1083,11 @@ class KDBNATClient:
 
             self._initialized = True
 
+            # Start data content discovery in the background so the first query
+            # does not pay for it serially
+            if not self._data_content_discovered:
+                self._start_data_content_discovery()
+
         except Exception as e:
             logger.error(f"Failed to initialize MCP client: {e}")
             raise
@@ -985,6 +1280,9 @@ class KDBNATClient:
             # Try schema discovery via tools as fallback
             await self._discover_schema_via_tools()
 
+        # Schema, SQL guidance and additional context may all have changed
+        self._context_version += 1
+
     def _build_schema_description_from_contents(self, contents: dict) -> str:
         """Build schema description from all resource contents."""
         if not contents:
@@ -1043,10 +1341,9 @@ class KDBNATClient:
 
         for tool_name, tool in self._tools.items():
             tool_name_lower = tool_name.lower()
-            tool_desc = getattr(tool, 'description', '').lower()
 
             # Check if tool appears to be schema-related
-            if any(keyword in tool_name_lower or keyword in tool_desc for keyword in schema_keywords):
+            if any(keyword in tool_name_lower or keyword in tool.description_lc for keyword in schema_keywords):
                 try:
                     logger.info(f"Attempting schema discovery via tool: {tool_name}")
                     # Call with empty args - schema tools typically don't need arguments
@@ -1130,10 +1427,10 @@ Do NOT assume any table or column names exist."""
 
         for name, tool in self._tools.items():
             tool_desc = f"### {name}\n"
-            tool_desc += f"Description: {getattr(tool, 'description', 'No description available')}\n"
+            tool_desc += f"Description: {tool.description or 'No description available'}\n"
 
             # Extract input schema if available
-            input_schema = getattr(tool, 'inputSchema', None)
+            input_schema = tool.input_schema
             if input_schema:
                 tool_desc += "Parameters:\n"
                 properties = input_schema.get('properties', {})
@@ -1264,8 +1561,8 @@ Do NOT assume any table or column names exist."""
         return [
             {
                 "name": name,
-                "description": getattr(tool, 'description', ''),
-                "inputSchema": getattr(tool, 'inputSchema', {})
+                "description": tool.description,
+                "inputSchema": tool.input_schema if tool.input_schema is not None else {}
             }
             for name, tool in self._tools.items()
         ]
@@ -1299,8 +1596,8 @@ Do NOT assume any table or column names exist."""
 
         # Discover actual data content before planning queries
         if not self._data_content_discovered:
-            logger.info("Discovering data content for intelligent query...")
-            await self.discover_data_content()
+            logger.info("Waiting for data content discovery for intelligent query...")
+            await self._ensure_data_content()
 
         if llm is None:
             llm = self._get_default_llm()
@@ -1311,46 +1608,82 @@ Do NOT assume any table or column names exist."""
         for iteration in range(max_iterations):
             logger.info(f"Planning iteration {iteration + 1}/{max_iterations}")
 
-            # Plan tool usage, including any discovered schema from previous iterations
-            plan = await self._plan_tool_usage(
-                user_query,
-                llm,
-                additional_schema=discovered_schema
-            )
-
-            # Check if data is not available (LLM determined schema doesn't support the query)
-            if plan.get("data_available") is False:
-                limitations = plan.get("limitations", "")
-                reasoning = plan.get("reasoning", "")
-                answer = f"{reasoning}\n\n{limitations}" if limitations else reasoning
-                logger.info(f"Data not available: {answer[:100]}...")
-                return answer, []
-
-            if not plan.get("steps"):
-                if iteration == 0:
-                    logger.info(f"No tools needed for query: {user_query[:50]}...")
-                    return plan.get("reasoning", "Unable to answer with available tools."), []
-                else:
-                    # We've done some work, break and synthesize
-                    break
-
-            # Execute the planned tools
-            iteration_results = []
-            schema_discovery_done = False
+            # The first plan usually starts with schema discovery, so start that tool call
+            # while the LLM plans and reuse its result if the plan asks for the same call
+            speculative_task = None
+            if iteration == 0 and self.SPECULATIVE_SCHEMA_TOOL in self._tools:
+                speculative_task = asyncio.create_task(self.call_tool(self.SPECULATIVE_SCHEMA_TOOL, {}))
 
-            for step in plan["steps"]:
+            try:
+                # Plan tool usage, including any discovered schema from previous iterations
+                plan = await self._plan_tool_usage(
+                    user_query,
+                    llm,
+                    additional_schema=discovered_schema
+                )
+
+                speculative_index = None
+                if speculative_task is not None:
+                    speculative_index = next(
+                        (i for i, step in enumerate(plan.get("steps") or [])
+                         if step.get("tool") == self.SPECULATIVE_SCHEMA_TOOL and not step.get("arguments")),
+                        None
+                    )
+                    logger.info(
+                        f"Speculative {self.SPECULATIVE_SCHEMA_TOOL} call: "
+                        f"speculation_hit={speculative_index is not None}"
+                    )
+                    if speculative_index is None:
+                        speculative_task.cancel()
+
+                # Check if data is not available (LLM determined schema doesn't support the query)
+                if plan.get("data_available") is False:
+                    limitations = plan.get("limitations", "")
+                    reasoning = plan.get("reasoning", "")
+                    answer = f"{reasoning}\n\n{limitations}" if limitations else reasoning
+                    logger.info(f"Data not available: {answer[:100]}...")
+                    return answer, []
+
+                if not plan.get("steps"):
+                    if iteration == 0:
+                        logger.info(f"No tools needed for query: {user_query[:50]}...")
+                        return plan.get("reasoning", "Unable to answer with available tools."), []
+                    else:
+                        # We've done some work, break and synthesize
+                        break
+
+                # Execute the planned tools, running independent steps concurrently
+                steps = plan["steps"]
+                step_results: list[Optional[dict]] = [None] * len(steps)
+                schema_discovery_done = False
+
+                for wave in _group_plan_steps(steps):
+                    for i in wave:
+                        logger.info(f"Executing tool: {steps[i].get('tool')} with args: {steps[i].get('arguments', {})}")
+                    # TaskGroup cancels the rest of the wave if one call fails or we are cancelled
+                    async with asyncio.TaskGroup() as tg:
+                        wave_tasks = [
+                            speculative_task if i == speculative_index
+                            else tg.create_task(self.call_tool(steps[i].get("tool"), steps[i].get("arguments", {})))
+                            for i in wave
+                        ]
+                    for i, task in zip(wave, wave_tasks):
+                        step_results[i] = await task
+            finally:
+                # Don't leave the speculative call running if planning fails, the plan
+                # returns early or skips it, or a wave fails before it is awaited
+                if speculative_task is not None and not speculative_task.done():
+                    speculative_task.cancel()
+
+            for step, result in zip(steps, step_results):
                 tool_name = step.get("tool")
-                arguments = step.get("arguments", {})
                 purpose = step.get("purpose", "").lower()
 
-                logger.info(f"Executing tool: {tool_name} with args: {arguments}")
-                result = await self.call_tool(tool_name, arguments)
                 result["purpose"] = step.get("purpose", "")
-                iteration_results.append(result)
                 all_tool_results.append(result)
 
                 # Check if this was a schema discovery step
-                if any(keyword in purpose for keyword in ['schema', 'discover', 'list tables', 'describe', 'metadata']):
+                if _SCHEMA_STEP_RE.search(purpose):
                     schema_discovery_done = True
                     # Extract schema info from result
                     if not result.get("error"):
@@ -1379,6 +1712,24 @@ Do NOT assume any table or column names exist."""
 
         return answer, all_tool_results
 
+    def _simple_chat_system_prompt(self) -> str:
+        """
+        Build the SQL generation system prompt for simple_chat_query.
+
+        Schema and data content are truncated to 2000 chars each; the rendered prompt
+        is memoized until the schema or data content changes.
+        """
+        cached = self._formatted_context_cache.get("simple_chat_prompt")
+        if cached and cached[0] == self._context_version:
+            return cached[1]
+
+        prompt = SIMPLE_CHAT_SQL_PROMPT.format(
+            schema_description=self._schema_description[:2000],
+            data_content=self.get_data_content_description()[:2000],
+        )
+        self._formatted_context_cache["simple_chat_prompt"] = (self._context_version, prompt)
+        return prompt
+
     def _format_additional_context(self) -> str:
         """
         Format additional context resources for the LLM prompt.
@@ -1389,17 +1740,23 @@ Do NOT assume any table or column names exist."""
         Returns:
             Formatted string of additional context or a note if none available
         """
-        if not self._additional_context:
-            return "No additional context available."
-
-        parts = []
-        for name, content in self._additional_context.items():
-            # Truncate very long content to avoid token waste
-            if len(content) > 2000:
-                content = content[:2000] + "\n... (truncated)"
-            parts.append(f"### {name}\n{content}")
+        cached = self._formatted_context_cache.get("additional_context")
+        if cached and cached[0] == self._context_version:
+            return cached[1]
 
-        return "\n\n".join(parts)
+        if not self._additional_context:
+            formatted = "No additional context available."
+        else:
+            parts = []
+            for name, content in self._additional_context.items():
+                # Truncate very long content to avoid token waste
+                if len(content) > 2000:
+                    content = content[:2000] + "\n... (truncated)"
+                parts.append(f"### {name}\n{content}")
+            formatted = "\n\n".join(parts)
+
+        self._formatted_context_cache["additional_context"] = (self._context_version, formatted)
+        return formatted
 
     async def _plan_tool_usage(
         self,
@@ -1414,32 +1771,35 @@ Do NOT assume any table or column names exist."""
         # Format additional context from other resources
         additional_context = self._format_additional_context()
 
-        # Combine known schema with any dynamically discovered schema
-        schema_description = self._schema_description
-        if additional_schema:
-            schema_description += f"\n\n## Dynamically Discovered Schema:\n{additional_schema}"
-
         # Get data content description (discovered data in tables)
         data_content = self.get_data_content_description()
 
-        prompt = TOOL_SELECTION_PROMPT.format(
-            tools_description=self._tools_description,
-            schema_description=schema_description,
-            data_content=data_content,
-            sql_guidance=sql_guidance,
-            additional_context=additional_context,
-            user_query=user_query
-        )
+        # Stable context goes in the system message; any dynamically discovered schema
+        # and the user query go last so the shared prefix stays cacheable
+        prompt = [
+            SystemMessage(content=TOOL_SELECTION_PROMPT.format(
+                tools_description=self._tools_description,
+                schema_description=self._schema_description,
+                data_content=data_content,
+                sql_guidance=sql_guidance,
+                additional_context=additional_context,
+            )),
+            HumanMessage(content=TOOL_SELECTION_USER_PROMPT.format(
+                additional_schema=f"## Dynamically Discovered Schema:\n{additional_schema}\n\n" if additional_schema else "",
+                user_query=user_query,
+            )),
+        ]
 
         try:
-            response = await llm.ainvoke(prompt)
-            content = response.content.strip()
+            content = (await self._cached_ainvoke(
+                llm, prompt, self.PLAN_CACHE_TTL, cache_if=self._is_parseable_plan
+            )).strip()
             logger.debug(f"LLM raw response ({len(content)} chars): {content[:500]}...")
 
             # Extract JSON from the response
             json_match = self._extract_json(content)
             if json_match:
-                plan = json.loads(json_match)
+                plan = _json_loads(json_match)
                 logger.info(f"Tool plan: {plan.get('reasoning', 'No reasoning')}")
                 logger.info(f"Tool steps: {len(plan.get('steps', []))} steps planned")
                 return plan
@@ -1478,27 +1838,30 @@ Do NOT assume any table or column names exist."""
         llm: ChatOpenAI
     ) -> str:
         """Synthesize tool results into a coherent answer."""
-        # Format tool results for the LLM
+        # Format tool results for the LLM (content lists can hold many rows, so the
+        # inner loop uses exact type checks and a bound append)
         results_text = []
+        append = results_text.append
         for i, result in enumerate(tool_results, 1):
-            tool_name = result.get("tool", "unknown")
             purpose = result.get("purpose", "")
             content = result.get("content", [])
             error = result.get("error")
 
-            results_text.append(f"### Step {i}: {tool_name}")
+            append(f"### Step {i}: {result.get('tool', 'unknown')}")
             if purpose:
-                results_text.append(f"Purpose: {purpose}")
+                append(f"Purpose: {purpose}")
 
             if error:
-                results_text.append(f"Error: {error}")
+                append(f"Error: {error}")
             elif content:
                 for item in content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        results_text.append(item.get("text", ""))
-                    elif isinstance(item, str):
-                        results_text.append(item)
-            results_text.append("")
+                    item_type = type(item)
+                    if item_type is dict:
+                        if item.get("type") == "text":
+                            append(item.get("text", ""))
+                    elif item_type is str:
+                        append(item)
+            append("")
 
         prompt = RESULT_SYNTHESIS_PROMPT.format(
             user_query=user_query,
@@ -1506,23 +1869,39 @@ Do NOT assume any table or column names exist."""
         )
 
         try:
-            response = await llm.ainvoke(prompt)
-            return response.content.strip()
+            response = await self._ainvoke(llm, prompt)
+            return response.strip()
         except Exception as e:
             logger.error(f"Error synthesizing results: {e}")
             return f"Error synthesizing results: {e}\n\nRaw results:\n" + "\n".join(results_text)
 
+    def _is_parseable_plan(self, content: str) -> bool:
+        """Whether a planning response holds a JSON plan object (unparseable plans are not cached)."""
+        json_text = self._extract_json(content.strip())
+        if json_text is None:
+            return False
+        try:
+            return isinstance(_json_loads(json_text), dict)
+        except json.JSONDecodeError:
+            return False
+
     def _extract_json(self, text: str) -> Optional[str]:
         """Extract JSON from text that might contain markdown code blocks or thinking tags."""
-        import re
+        # Common case: one linear scan finds the first complete object outside think tags.
+        # Fenced output goes straight to the code block search below so the fenced
+        # answer wins over any example object in the prose before it.
+        if '```' not in text:
+            candidate = _extract_json_fast(text)
+            if candidate is not None:
+                return candidate
 
         original_text = text  # Keep for logging
 
         # Strip ALL Nemotron thinking tags (handle multiple blocks and nested content)
         # Use greedy match to catch everything between <think> and </think>
-        text = re.sub(r'<think>[\s\S]*?</think>', '', text, flags=re.IGNORECASE)
+        text = _THINK_RE.sub('', text)
         # Also handle unclosed think tags (model sometimes doesn't close them)
-        text = re.sub(r'<think>[\s\S]*$', '', text, flags=re.IGNORECASE)
+        text = _THINK_OPEN_RE.sub('', text)
         text = text.strip()
 
         # If text is empty after stripping, log and return None
@@ -1531,11 +1910,11 @@ Do NOT assume any table or column names exist."""
             return None
 
         # Try to find JSON in code blocks first (greedy match for nested content)
-        code_block_match = re.search(r'```(?:json)?\s*(\{[\s\S]*\})\s*```', text)
+        code_block_match = _CODE_BLOCK_RE.search(text)
         if code_block_match:
             candidate = code_block_match.group(1).strip()
             try:
-                json.loads(candidate)
+                _json_loads(candidate)
                 return candidate
             except json.JSONDecodeError:
                 pass
@@ -1554,7 +1933,7 @@ Do NOT assume any table or column names exist."""
 
         candidate = text[first_brace:last_brace + 1]
         try:
-            json.loads(candidate)
+            _json_loads(candidate)
             return candidate
         except json.JSONDecodeError as e:
             logger.debug(f"JSON decode failed for first/last brace approach: {e}")
@@ -1562,17 +1941,18 @@ Do NOT assume any table or column names exist."""
         # Try a balanced brace approach
         depth = 0
         start = -1
-        for i, char in enumerate(text):
-            if char == '{':
+        for match in _BRACE_RE.finditer(text):
+            i = match.start()
+            if match.group() == '{':
                 if depth == 0:
                     start = i
                 depth += 1
-            elif char == '}':
+            else:
                 depth -= 1
                 if depth == 0 and start != -1:
                     candidate = text[start:i + 1]
                     try:
-                        json.loads(candidate)
+                        _json_loads(candidate)
                         return candidate
                     except json.JSONDecodeError:
                         start = -1  # Try next potential JSON
@@ -1586,23 +1966,26 @@ Do NOT assume any table or column names exist."""
         """
         schema_info = ""
 
-        # Read MCP resources for schema info
-        # kdbx_describe_tables - lists tables and their columns
-        # kdbx_sql_query_guidance - SQL syntax help
-        schema_resource_names = ['kdbx_describe_tables', 'kdbx_sql_query_guidance']
+        # Read MCP resources for schema info (see _SCHEMA_RESOURCE_NAMES)
+        targets = [
+            (resource.get("name", ""), resource.get("uri", ""))
+            for resource in self._resources
+            if resource.get("name", "") in _SCHEMA_RESOURCE_NAMES
+        ]
 
-        for resource in self._resources:
-            uri = resource.get("uri", "")
-            name = resource.get("name", "")
+        # Resource reads are independent, so fetch them concurrently
+        for name, _ in targets:
+            logger.info(f"Reading MCP resource: {name}")
+        contents = await asyncio.gather(
+            *(self._read_resource(uri) for _, uri in targets),
+            return_exceptions=True
+        )
 
-            if name in schema_resource_names:
-                try:
-                    logger.info(f"Reading MCP resource: {name}")
-                    content = await self._read_resource(uri)
-                    if content:
-                        schema_info += f"\n## {name}\n{content}\n"
-                except Exception as e:
-                    logger.debug(f"Resource {name} read failed: {e}")
+        for (name, _), content in zip(targets, contents):
+            if isinstance(content, Exception):
+                logger.debug(f"Resource {name} read failed: {content}")
+            elif content:
+                schema_info += f"\n## {name}\n{content}\n"
 
         # Fall back to cached schema
         if not schema_info and self._schema_description:
@@ -1622,8 +2005,8 @@ Do NOT assume any table or column names exist."""
 Answer based on the information above. Be concise and helpful."""
 
         try:
-            response = await llm.ainvoke(prompt)
-            return response.content.strip()
+            response = await self._ainvoke(llm, prompt)
+            return response.strip()
         except Exception as e:
             logger.error(f"Schema answer generation failed: {e}")
             return None
@@ -1633,22 +2016,13 @@ Answer based on the information above. Be concise and helpful."""
         Fallback: Try to extract SQL query directly from LLM response.
         Used when JSON parsing fails but the model might have included a query.
         """
-        import re
-
         # Strip think tags
-        text = re.sub(r'<think>[\s\S]*?</think>', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'<think>[\s\S]*$', '', text, flags=re.IGNORECASE)
+        text = _THINK_RE.sub('', text)
+        text = _THINK_OPEN_RE.sub('', text)
 
         # Look for SQL patterns
-        sql_patterns = [
-            r'SELECT\s+[\s\S]+?(?:FROM|LIMIT)\s+\w+',  # SELECT ... FROM/LIMIT
-            r'"query"\s*:\s*"([^"]+)"',  # "query": "..."
-            r'`([^`]*SELECT[^`]*)`',  # `SELECT ...`
-            r'query["\']?\s*[:=]\s*["\']([^"\']+)["\']',  # query: "..." or query='...'
-        ]
-
-        for pattern in sql_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _SQL_PATTERNS:
+            match = pattern.search(text)
             if match:
                 sql = match.group(1) if match.lastindex else match.group(0)
                 sql = sql.strip()
@@ -1659,11 +2033,25 @@ Answer based on the information above. Be concise and helpful."""
         return None
 
     def _get_default_llm(self) -> ChatOpenAI:
-        """Get the default LLM for tool planning and synthesis."""
+        """
+        Get the default LLM for tool planning and synthesis.
+
+        The client (and its HTTP connection pool) is reused while the configuration
+        and event loop stay the same, avoiding connection setup on every query.
+        """
         instruct_base_url = os.getenv("INSTRUCT_BASE_URL", "https://integrate.api.nvidia.com/v1")
         instruct_model_name = os.getenv("INSTRUCT_MODEL_NAME", "meta/llama-3.3-70b-instruct")
         instruct_api_key = os.getenv("INSTRUCT_API_KEY", os.getenv("NVIDIA_API_KEY", ""))
 
+        # The async HTTP pool is bound to the loop it was first used on
+        try:
+            loop_id = id(asyncio.get_running_loop())
+        except RuntimeError:
+            loop_id = None
+        key = (loop_id, instruct_base_url, instruct_model_name, instruct_api_key)
+        if self._default_llm is not None and self._default_llm[0] == key:
+            return self._default_llm[1]
+
         llm_config = {
             "base_url": instruct_base_url,
             "model": instruct_model_name,
@@ -1673,7 +2061,9 @@ Answer based on the information above. Be concise and helpful."""
         if instruct_api_key:
             llm_config["api_key"] = instruct_api_key
 
-        return ChatOpenAI(**llm_config)
+        llm = ChatOpenAI(**llm_config)
+        self._default_llm = (key, llm)
+        return llm
 
     async def simple_chat_query(
         self,
@@ -1701,79 +2091,42 @@ Answer based on the information above. Be concise and helpful."""
 
         # Discover actual data content before generating queries
         if not self._data_content_discovered:
-            logger.info("Discovering data content for simple chat query...")
-            await self.discover_data_content()
+            logger.info("Waiting for data content discovery for simple chat query...")
+            await self._ensure_data_content()
 
         if llm is None:
             llm = self._get_default_llm()
 
         # Check if this is a schema/metadata question (answer from cached schema, no SQL)
-        query_lower = user_query.lower()
-        schema_keywords = ['what table', 'which table', 'list table', 'show table', 'available table',
-                          'what schema', 'describe schema', 'database schema', 'what column']
-
-        if any(keyword in query_lower for keyword in schema_keywords):
+        if _SCHEMA_QUESTION_RE.search(user_query.lower()):
             logger.info(f"Schema question detected, answering from cached schema")
             schema_answer = await self._answer_from_schema(user_query, llm)
             if schema_answer:
                 return schema_answer, None, []
 
-        # Get data content description for context
-        data_content = self.get_data_content_description()
-
-        # Enhanced prompt with data content
-        prompt = f"""Generate a SQL query for this question. Return ONLY the SQL, nothing else.
-
-Schema:
-{self._schema_description[:2000]}
-
-Available Data (IMPORTANT - check this before querying):
-{data_content[:2000]}
-
-IMPORTANT RULES:
-- ALWAYS quote column names with double quotes: SELECT "col1", "col2" FROM tablename
-- SQL reserved words MUST be quoted: "date", "time", "open", "close", "high", "low", "name", "type", "index"
-- Use ticker symbols for filtering, NOT company names
-- Check "Available values" above to verify the symbol exists BEFORE querying
-- Only use columns that exist in the schema
-- If searching text, search multiple text columns
-- DATE FILTERING: Do NOT use LIKE on date columns. Instead use:
-  * For year: EXTRACT(YEAR FROM "date") = 2023
-  * For month: EXTRACT(MONTH FROM "date") = 12
-  * For date range: "date" >= '2023-01-01' AND "date" <= '2023-12-31'
-  * For specific date: "date" = '2023-06-15'
-- ALWAYS close string literals with matching quotes: WHERE "sym" = 'AAPL' (not 'AAPL)
-
-Question: {user_query}
-
-SQL:"""
+        # Enhanced prompt with data content; the question goes in its own trailing
+        # message so the schema/data prefix stays cacheable across questions
+        system_prompt = self._simple_chat_system_prompt()
+        prompt = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Question: {user_query}\n\nSQL:"),
+        ]
 
         try:
             # Generate SQL
-            response = await llm.ainvoke(prompt)
-            sql_query = response.content.strip()
+            async with self._llm_semaphore:
+                response = await llm.ainvoke(prompt)
 
             # Strip think tags if present
-            import re
-            sql_query = re.sub(r'<think>[\s\S]*?</think>', '', sql_query, flags=re.IGNORECASE)
-            sql_query = re.sub(r'<think>[\s\S]*$', '', sql_query, flags=re.IGNORECASE)
+            sql_query = _THINK_OPEN_RE.sub('', _THINK_RE.sub('', response.content))
 
-            # Clean up the SQL (remove markdown, quotes, etc.)
-            sql_query = sql_query.replace('```sql', '').replace('```', '').strip()
-            sql_query = sql_query.strip('"\'')
-
-            # Fix JSON-escaped quotes (LLM might return escaped strings)
-            # Handle double-escaped: \\\" -> "
-            sql_query = sql_query.replace('\\"', '"')
-            # Handle backslash-escaped single quotes too
-            sql_query = sql_query.replace("\\'", "'")
+            sql_query = _clean_generated_sql(sql_query)
 
             # Validate it looks like SQL
             if not sql_query.upper().startswith('SELECT'):
                 logger.warning(f"LLM response doesn't look like SQL: {sql_query[:100]}")
                 # Try to extract SQL from response
-                import re
-                match = re.search(r'SELECT\s+.+', sql_query, re.IGNORECASE | re.DOTALL)
+                match = _SELECT_RE.search(sql_query)
                 if match:
                     sql_query = match.group(0).strip()
                 else:
@@ -1795,12 +2148,12 @@ SQL:"""
                 if isinstance(item, dict) and item.get("type") == "text":
                     text = item.get("text", "")
                     try:
-                        parsed = json.loads(text)
+                        parsed = _json_loads(text)
                         if isinstance(parsed, dict):
                             if "data" in parsed:
                                 data = parsed["data"]
                                 if isinstance(data, str):
-                                    data = json.loads(data)
+                                    data = _json_loads(data)
                             elif "rows" in parsed:
                                 data = parsed["rows"]
                             elif "status" in parsed and parsed.get("status") == "success":
@@ -1810,7 +2163,8 @@ SQL:"""
 
             # Generate simple answer
             if data:
-                answer = await self._generate_simple_answer(user_query, sql_query, data, llm)
+                # Only the first rows go into the prompt; the full result is returned to the caller
+                answer = await self._generate_simple_answer(user_query, sql_query, data[:10], len(data), llm)
             else:
                 answer = "Query executed but returned no data."
 
@@ -1824,29 +2178,117 @@ SQL:"""
         self,
         user_query: str,
         sql_query: str,
-        data: list,
+        data_preview: list,
+        total_rows: int,
         llm: ChatOpenAI
     ) -> str:
-        """Generate a simple natural language answer from query results."""
-        # Limit data for prompt
-        data_preview = data[:10] if len(data) > 10 else data
-        data_str = json.dumps(data_preview, indent=2)
+        """
+        Generate a simple natural language answer from query results.
+
+        Args:
+            user_query: The user's question
+            sql_query: The SQL that produced the results
+            data_preview: First rows of the result, included in the prompt
+            total_rows: Total number of rows returned by the query
+            llm: LLM instance
+        """
+        data_str = _json_dumps(data_preview, indent=True)
 
         prompt = f"""Based on this data, provide a brief answer to the user's question.
 
 Question: {user_query}
 SQL: {sql_query}
-Data ({len(data)} rows):
+Data ({total_rows} rows):
 {data_str}
 
 Provide a concise, helpful answer (2-4 sentences). Include key numbers/values from the data."""
 
         try:
-            response = await llm.ainvoke(prompt)
-            return response.content.strip()
+            response = await self._ainvoke(llm, prompt)
+            return response.strip()
         except Exception as e:
             logger.error(f"Answer generation failed: {e}")
-            return f"Found {len(data)} rows of data."
+            return f"Found {total_rows} rows of data."
+
+
+def _group_plan_steps(steps: list[dict]) -> list[list[int]]:
+    """
+    Group plan steps into waves that can be executed concurrently.
+
+    A step may name the earlier steps it needs via "depends_on" (0-based
+    indices). Each step is placed in the wave after its latest dependency;
+    steps without dependencies all land in the first wave. Invalid or
+    forward references are ignored.
+
+    Args:
+        steps: Plan steps as returned by the LLM
+
+    Returns:
+        List of waves, each a list of step indices in plan order
+    """
+    levels: list[int] = []
+    for i, step in enumerate(steps):
+        depends_on = step.get("depends_on") or []
+        if not isinstance(depends_on, list):
+            depends_on = [depends_on]
+        level = 0
+        for dep in depends_on:
+            if isinstance(dep, int) and 0 <= dep < i:
+                level = max(level, levels[dep] + 1)
+        levels.append(level)
+
+    waves: list[list[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for i, level in enumerate(levels):
+        waves[level].append(i)
+    return waves
+
+
+def _extract_json_fast(text: str) -> Optional[str]:
+    """
+    Return the first complete JSON object in text, skipping <think> regions.
+
+    Scans the text once, tracking brace depth and string/escape state, and
+    attempts json.loads only on the first balanced object. Only structural
+    characters are visited; the regex engine skips the text between them. Returns None when
+    no parsable object is found so callers can fall back to a slower search.
+    """
+    lowered = text.lower()
+    n = len(text)
+    pos = 0
+    while pos < n:
+        brace = text.find('{', pos)
+        if brace == -1:
+            return None
+        think = lowered.find('<think>', pos, brace)
+        if think != -1:
+            think_end = lowered.find('</think>', think + 7)
+            if think_end == -1:
+                return None  # Unclosed think tag: the rest is reasoning
+            pos = think_end + 8
+            continue
+
+        depth = 0
+        in_string = False
+        for match in _JSON_TOKEN_RE.finditer(text, brace):
+            token = match.group()
+            if in_string:
+                if token == '"':
+                    in_string = False
+            elif token == '"':
+                in_string = True
+            elif token == '{':
+                depth += 1
+            elif token == '}':
+                depth -= 1
+                if depth == 0:
+                    candidate = text[brace:match.end()]
+                    try:
+                        _json_loads(candidate)
+                        return candidate
+                    except json.JSONDecodeError:
+                        return None
+        return None
+    return None
 
 
 # Global client instance
@@ -1908,11 +2350,8 @@ async def search_kdb_nat(
             logger.info(f"KDB+ could not answer query: {query[:50]}...")
             return "", "", 0
 
-        # Format citations from tool results
-        citations = _format_intelligent_citations(query, tool_results)
-
-        # Count records from tool results
-        record_count = _count_records_from_results(tool_results)
+        # Format citations and count records in one pass over the tool results
+        citations, record_count = _format_intelligent_citations(query, tool_results)
 
         logger.info(f"Intelligent KDB+ search successful for query: {query[:50]}...")
         return answer, citations, record_count
@@ -1922,21 +2361,17 @@ async def search_kdb_nat(
         return "", "", 0
 
 
-def _count_records_from_results(tool_results: list[dict]) -> int:
-    """Count total records from tool results."""
-    total = 0
-    for result in tool_results:
-        content = result.get("content", [])
-        if content and not result.get("error"):
-            # Each content item might be a row or a result
-            total += len(content)
-    return total
-
+def _format_intelligent_citations(query: str, tool_results: list[dict]) -> tuple[str, int]:
+    """
+    Format tool results as citations and count the records they returned.
 
-def _format_intelligent_citations(query: str, tool_results: list[dict]) -> str:
-    """Format tool results as citations."""
+    Returns:
+        Tuple of (citations, record_count)
+    """
     if not tool_results:
-        return ""
+        return "", 0
+
+    record_count = 0
 
     citation_parts = [
         "---",
@@ -1954,19 +2389,22 @@ def _format_intelligent_citations(query: str, tool_results: list[dict]) -> str:
         if purpose:
             citation_parts.append(f"  Purpose: {purpose}")
         if arguments:
+            # Display text: keep json.dumps' spaced separators
             citation_parts.append(f"  Arguments: {json.dumps(arguments)}")
 
         # Include relevant content
         content = result.get("content", [])
         if content and not result.get("error"):
+            # Each content item might be a row or a result
+            record_count += len(content)
             citation_parts.append("  Result preview:")
             for item in content[:2]:  # Limit to first 2 items
-                if isinstance(item, dict) and item.get("type") == "text":
+                if type(item) is dict and item.get("type") == "text":
                     text = item.get("text", "")[:200]
                     citation_parts.append(f"    {text}...")
 
     citation_parts.append("---")
-    return "\n".join(citation_parts)
+    return "\n".join(citation_parts), record_count
 
 
 # Alias for backwards compatibility
@@ -145,6 +145,7 @@ async def web_research(
     collection = config["configurable"].get("collection")
     # Get use_kdb flag - None means legacy auto-detect behavior
     use_kdb = config["configurable"].get("use_kdb", None)
+    speculative_web = config["configurable"].get("speculative_web", False)
 
     logger.info(f"Web research config: search_web={search_web}, use_kdb={use_kdb}, collection={collection}")
 
@@ -156,7 +157,10 @@ async def web_research(
 
     # Process each query concurrently.
     results = await asyncio.gather(*[
-        process_single_query(query, config, writer, collection, llm, search_web, use_kdb=use_kdb)
+        process_single_query(
+            query, config, writer, collection, llm, search_web,
+            use_kdb=use_kdb, speculative_web=speculative_web
+        )
         for query in queries
     ])
 
@@ -231,6 +235,7 @@ async def reflect_on_summary(state: AIRAState, config: RunnableConfig, writer: S
     collection = config["configurable"].get("collection")
     # Get use_kdb flag - None means legacy auto-detect behavior
     use_kdb = config["configurable"].get("use_kdb", None)
+    speculative_web = config["configurable"].get("speculative_web", False)
 
     logger.info(f"REFLECTING {num_reflections} TIMES (use_kdb={use_kdb})")
 
@@ -297,7 +302,8 @@ async def reflect_on_summary(state: AIRAState, config: RunnableConfig, writer: S
             collection=collection,
             llm=llm,
             search_web=search_web,
-            use_kdb=use_kdb
+            use_kdb=use_kdb,
+            speculative_web=speculative_web
         )
 
 
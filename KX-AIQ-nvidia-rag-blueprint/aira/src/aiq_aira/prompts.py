@@ -283,6 +283,33 @@ relevancy_checker = """Determine if the Context contains proper information to a
 }}
 ```"""
 
+relevancy_checker_pair = """Determine, for each of two Contexts, whether it contains proper information to answer the Question.
+
+# Question
+{query}
+
+# Context A
+{document_a}
+
+# Context B
+{document_b}
+
+# Instructions
+1. Give a binary score 'yes' or 'no' for each context to indicate whether it is able to answer the question on its own.
+2. The contexts may come from various sources including:
+   - Document retrieval (RAG) - research papers, reports, analysis
+   - KDB+ financial database - market data, trades, time-series, prices
+   - Web search - current events, news, general information
+3. Evaluate each context independently, regardless of source.
+
+**Output example**
+```json
+{{
+    "document_a": "yes",
+    "document_b": "no"
+}}
+```"""
+
 finalize_report = meta_prompt + """
 
 Given the report draft below, format a final report to best achieve the report goal.
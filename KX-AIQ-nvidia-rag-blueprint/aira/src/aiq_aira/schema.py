@@ -264,3 +264,4 @@ class ConfigSchema(TypedDict, total=False):
     search_web: bool
     topic: str
     use_kdb: bool | None  # None = auto-detect (legacy), True = force KDB, False = disable KDB
+    speculative_web: bool  # Start web search while relevancy is checked (default False)
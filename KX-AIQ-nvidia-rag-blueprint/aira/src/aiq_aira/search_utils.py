@@ -16,10 +16,14 @@
 
 import asyncio
 import aiohttp
+import hashlib
+import orjson
 import re
-import time
-import xml.etree.ElementTree as ET
-from typing import List, Tuple, Optional, Dict, Any
+import string
+import weakref
+from xml.sax.saxutils import escape as xml_escape
+from collections import OrderedDict
+from typing import AsyncGenerator, List, Tuple, Optional, Dict, Any
 from dataclasses import dataclass
 from langchain_openai import ChatOpenAI
 from langchain_core.runnables import RunnableConfig
@@ -28,7 +32,7 @@ from langgraph.types import StreamWriter
 import logging
 from langchain_core.utils.json import parse_json_markdown
 from aiq_aira.schema import GeneratedQuery
-from aiq_aira.prompts import relevancy_checker
+from aiq_aira.prompts import relevancy_checker, relevancy_checker_pair
 from aiq_aira.tools import search_rag, search_tavily
 from aiq_aira.utils import dummy, _escape_markdown
 # Import KDB+ tools (requires NAT 1.3.0+ with MCP package)
@@ -42,6 +46,13 @@ from aiq_aira.kdb_tools_nat import (
 import html
 
 
+# Phrases that mark a short answer as an empty/error response, matched in one scan
+_EMPTY_RESPONSE_RE = re.compile(
+    "no data|no results|not found|no relevant|no information|unable to|error",
+    re.IGNORECASE
+)
+
+
 @dataclass
 class SourceResult:
     """Result from a single data source with metadata."""
@@ -56,18 +67,11 @@ class SourceResult:
         """Check if the result has meaningful content."""
         if not self.content:
             return True
+        # Long answers are never treated as empty, so skip the scan for them
+        if len(self.content) >= 200:
+            return False
         # Check for common empty/error responses
-        empty_patterns = [
-            "no data",
-            "no results",
-            "not found",
-            "no relevant",
-            "no information",
-            "unable to",
-            "error",
-        ]
-        content_lower = self.content.lower()
-        return any(p in content_lower for p in empty_patterns) and len(self.content) < 200
+        return _EMPTY_RESPONSE_RE.search(self.content) is not None
 
 
 def merge_hybrid_results(
@@ -159,6 +163,16 @@ async def classify_query_type(query: str, llm: ChatOpenAI = None, use_kdb: bool
         'rag' - Document/unstructured content queries
         'web' - Current events/general web queries
     """
+    return _classify_query_type_fast(query, use_kdb=use_kdb)
+
+
+def _classify_query_type_fast(query: str, use_kdb: bool | None = None) -> str:
+    """
+    Keyword-only classification behind classify_query_type.
+
+    Synchronous because no branch does I/O, so process_single_query can call it
+    without creating a coroutine.
+    """
     # Handle explicit use_kdb flag (new UI behavior)
     if use_kdb is True:
         # Force KDB for all queries when explicitly enabled by user
@@ -180,37 +194,116 @@ async def classify_query_type(query: str, llm: ChatOpenAI = None, use_kdb: bool
     return "rag"
 
 
-async def check_relevancy(llm: ChatOpenAI, query: str, answer: str, writer: StreamWriter):
+def _compile_prompt(template: str):
     """
-    Checks if an answer is relevant to the query using the 'relevancy_checker' prompt, returning JSON
-    like { "score": "yes" } or { "score": "no" }.
+    Pre-parse a str.format prompt template once and return a renderer that only
+    slots the values into the literal pieces, skipping the per-call format parse.
+    Only plain {name} fields are supported.
     """
-    logger.info("CHECK RELEVANCY")    
-    writer({"relevancy_checker": "\n Starting relevancy check \n"})
-    processed_answer_for_display = html.escape(_escape_markdown(answer))
+    pieces: List[str] = []
+    slots: List[Tuple[int, str]] = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if spec or conversion:
+            raise ValueError(f"Unsupported prompt field: {{{field}!{conversion}:{spec}}}")
+        pieces.append(literal)
+        if field is not None:
+            slots.append((len(pieces), field))
+            pieces.append("")
+
+    def render(**values: str) -> str:
+        out = pieces.copy()
+        for index, field in slots:
+            out[index] = str(values[field])
+        return "".join(out)
+
+    return render
+
+
+_render_relevancy_prompt = _compile_prompt(relevancy_checker)
+_render_relevancy_pair_prompt = _compile_prompt(relevancy_checker_pair)
+
+
+# Bounded LRU of relevancy scores keyed on a digest of (model, query, answer).
+# Only successfully parsed LLM scores are stored, never the fallback default.
+RELEVANCY_CACHE_SIZE = 4096
+_relevancy_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def _relevancy_cache_key(llm: ChatOpenAI, query: str, answer: str) -> str:
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", "")
+    return hashlib.blake2b(f"{model}\0{query}\0{answer}".encode(), digest_size=16).hexdigest()
+
+
+def _cache_relevancy(cache_key: str, score: dict):
+    _relevancy_cache[cache_key] = dict(score)
+    while len(_relevancy_cache) > RELEVANCY_CACHE_SIZE:
+        _relevancy_cache.popitem(last=False)
+
 
+def _parse_json_markdown(text: str) -> Any:
+    """
+    Parse a (possibly ```json fenced) LLM JSON reply with orjson, falling back
+    to langchain's parse_json_markdown for anything orjson rejects.
+    """
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = stripped.split("```", 2)[1].removeprefix("json")
     try:
-        async with asyncio.timeout(ASYNC_TIMEOUT):
-            response = await llm.ainvoke(
-                relevancy_checker.format(document=answer, query=query)
-            )
-            score = parse_json_markdown(response.content)
-            writer({"relevancy_checker": f""" =
+        return orjson.loads(stripped)
+    except orjson.JSONDecodeError:
+        return parse_json_markdown(text)
+
+
+def _write_relevancy_score(writer: StreamWriter, score: dict, query: str, answer: str):
+    writer({"relevancy_checker": f""" =
     ---
     Relevancy score: {score.get("score")}  
     Query: {query}
-    Answer: {processed_answer_for_display}
+    Answer: {html.escape(_escape_markdown(answer))}
     """})
 
+
+async def check_relevancy(llm: ChatOpenAI, query: str, answer: str, writer: StreamWriter, announce: bool = True):
+    """
+    Checks if an answer is relevant to the query using the 'relevancy_checker' prompt, returning JSON
+    like { "score": "yes" } or { "score": "no" }.
+
+    announce=False skips the "Starting relevancy check" event when the caller already sent it.
+    """
+    logger.info("CHECK RELEVANCY")    
+    if announce:
+        writer({"relevancy_checker": "\n Starting relevancy check \n"})
+
+    # Identical (model, query, answer) checks reuse the earlier score
+    cache_key = _relevancy_cache_key(llm, query, answer)
+
+    try:
+        async with asyncio.timeout(ASYNC_TIMEOUT):
+            cached = _relevancy_cache.get(cache_key)
+            if cached is not None:
+                _relevancy_cache.move_to_end(cache_key)
+                logger.info("Relevancy cache hit")
+                score = dict(cached)
+            else:
+                response = await llm.ainvoke(
+                    _render_relevancy_prompt(document=answer, query=query)
+                )
+                score = _parse_json_markdown(response.content)
+                if isinstance(score, dict):
+                    _cache_relevancy(cache_key, score)
+            _write_relevancy_score(writer, score, query, answer)
+
             return score
     
     except asyncio.TimeoutError as e:
+             processed_answer_for_display = html.escape(_escape_markdown(answer))
              writer({"relevancy_checker": f""" 
 ----------                
 LLM time out evaluating relevancy. Query: {query} \n \n Answer: {processed_answer_for_display} 
 ----------
 """})   
     except Exception as e:
+        processed_answer_for_display = html.escape(_escape_markdown(answer))
         writer({"relevancy_checker": f"""
 ---------
 Error checking relevancy. Query: {query} \n \n Answer: {processed_answer_for_display} 
@@ -222,6 +315,64 @@ Error checking relevancy. Query: {query} \n \n Answer: {processed_answer_for_dis
     return {"score": "yes"}
 
 
+async def check_relevancy_pair(
+    llm: ChatOpenAI,
+    query: str,
+    answer_a: str,
+    answer_b: str,
+    writer: StreamWriter
+) -> Tuple[dict, dict]:
+    """
+    Checks two answers to the same query with a single LLM call using the
+    'relevancy_checker_pair' prompt, returning one score dict per answer in the
+    same shape as check_relevancy.
+
+    Falls back to individual check_relevancy calls when either answer is already
+    cached or the paired response cannot be parsed.
+    """
+    # Announced once here; the individual fallbacks below do not repeat it
+    writer({"relevancy_checker": "\n Starting relevancy check \n"})
+
+    key_a = _relevancy_cache_key(llm, query, answer_a)
+    key_b = _relevancy_cache_key(llm, query, answer_b)
+    if key_a in _relevancy_cache or key_b in _relevancy_cache:
+        return tuple(await asyncio.gather(
+            check_relevancy(llm, query, answer_a, writer, announce=False),
+            check_relevancy(llm, query, answer_b, writer, announce=False),
+        ))
+
+    logger.info("CHECK RELEVANCY (PAIR)")
+
+    try:
+        async with asyncio.timeout(ASYNC_TIMEOUT):
+            response = await llm.ainvoke(
+                _render_relevancy_pair_prompt(document_a=answer_a, document_b=answer_b, query=query)
+            )
+        scores = _parse_json_markdown(response.content)
+        score_a = {"score": scores["document_a"]}
+        score_b = {"score": scores["document_b"]}
+        if not {score_a["score"], score_b["score"]} <= {"yes", "no"}:
+            raise ValueError(f"Unexpected relevancy scores: {scores}")
+    except asyncio.TimeoutError:
+        writer({"relevancy_checker": f""" 
+----------                
+LLM time out evaluating relevancy. Query: {query}
+----------
+"""})
+        return {"score": "yes"}, {"score": "yes"}
+    except Exception as e:
+        logger.debug(f"Error parsing paired relevancy JSON, checking individually: {e}")
+        return tuple(await asyncio.gather(
+            check_relevancy(llm, query, answer_a, writer, announce=False),
+            check_relevancy(llm, query, answer_b, writer, announce=False),
+        ))
+
+    for cache_key, score, answer in ((key_a, score_a, answer_a), (key_b, score_b, answer_b)):
+        _cache_relevancy(cache_key, score)
+        _write_relevancy_score(writer, score, query, answer)
+    return score_a, score_b
+
+
 async def fetch_query_results(
     rag_url: str,
     prompt: str,
@@ -232,11 +383,59 @@ async def fetch_query_results(
     Calls the search_rag tool for a prompt.
     Returns a tuple (answer, citations, doc_count).
     """
-    async with aiohttp.ClientSession() as session:
-        result = await search_rag(session, rag_url, prompt, writer, collection)
-        # search_rag returns (answer, citations, doc_count)
-        return result
+    session = await _get_rag_session()
+    # search_rag returns (answer, citations, doc_count)
+    return await search_rag(session, rag_url, prompt, writer, collection)
+
+
+# One pooled RAG client session per event loop, so queries reuse TCP/TLS connections.
+# Each entry also holds the async generator that closes the session with its loop.
+_rag_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[aiohttp.ClientSession, AsyncGenerator]]" = weakref.WeakKeyDictionary()
+
+
+async def _get_rag_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session for the running event loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    entry = _rag_sessions.get(loop)
+    if entry is None or entry[0].closed:
+        if entry is not None:
+            await entry[1].aclose()
+        # Sessions reference their loop, so drop entries of loops that have been closed
+        for stale_loop in [other for other in _rag_sessions if other.is_closed()]:
+            del _rag_sessions[stale_loop]
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60)
+        )
+        closer = _close_with_loop(session)
+        await closer.__anext__()
+        entry = _rag_sessions[loop] = (session, closer)
+    return entry[0]
+
+
+async def _close_with_loop(session: aiohttp.ClientSession) -> AsyncGenerator[None, None]:
+    """
+    Suspend until finalized, then close the session.
+
+    Event loops finalize pending async generators on shutdown (asyncio.run calls
+    loop.shutdown_asyncgens()), so the session is closed before its loop is,
+    including short-lived loops in tests or per-request runners.
+    """
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+async def close_rag_sessions():
+    """
+    Close the pooled RAG session of the running event loop.
 
+    Called from the teardown of the NAT functions that run RAG queries, so the
+    connector's sockets are released when the workflow shuts down.
+    """
+    entry = _rag_sessions.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
 
 
 def deduplicate_and_format_sources(
@@ -252,23 +451,30 @@ def deduplicate_and_format_sources(
     If 'relevant_list' says "score": "no", we fallback to 'web_results' if present.
     """
     logger.info("DEDUPLICATE RESULTS")
-    root = ET.Element("sources")
+    # Built as a string directly; the output matches ElementTree.tostring for this shape
+    parts = []
 
     for q_json, src, relevant_info, fallback_ans, gen_ans in zip(
         queries, sources, relevant_list, web_results, generated_answers
     ):
-        source_elem = ET.SubElement(root, "source")
-        query_elem = ET.SubElement(source_elem, "query")
-        query_elem.text = q_json.query
-        answer_elem = ET.SubElement(source_elem, "answer")
-
         # If the RAG doc was relevant, use gen_ans; else fallback to 'fallback_ans'
         if relevant_info["score"] == "yes" or fallback_ans is None:
-            answer_elem.text = gen_ans
+            answer = gen_ans
         else:
-            answer_elem.text = fallback_ans
+            answer = fallback_ans
+
+        parts.append(f"<source>{_xml_text_element('query', q_json.query)}{_xml_text_element('answer', answer)}</source>")
+
+    if not parts:
+        return "<sources />"
+    return f"<sources>{''.join(parts)}</sources>"
 
-    return ET.tostring(root, encoding="unicode")
+
+def _xml_text_element(tag: str, text: Optional[str]) -> str:
+    """Serialize a text-only XML element the way ElementTree does (empty text -> <tag />)."""
+    if not text:
+        return f"<{tag} />"
+    return f"<{tag}>{xml_escape(text)}</{tag}>"
 
 
 
@@ -280,7 +486,8 @@ async def process_single_query(
         llm,
         search_web: bool,
         use_kdb: bool | None = None,
-        hybrid_mode: bool = True
+        hybrid_mode: bool = True,
+        speculative_web: bool = False
 ):
     """
     Process a single query with hybrid search across multiple data sources.
@@ -306,12 +513,19 @@ async def process_single_query(
             - True: Force KDB search for all queries
             - False: Disable KDB search entirely
         hybrid_mode: Enable parallel KDB+RAG execution with result merging (default: True)
+        speculative_web: Start the web search while relevancy is being checked (the
+            RAG answer in sequential mode, both sources in hybrid mode) and discard it
+            if a relevant answer was found. Removes
+            web search latency from the fallback path at the cost of extra Tavily calls
+            (default: False)
 
     Returns a tuple of:
       (answer, citation, relevancy, web_answer, web_citation)
     """
 
     rag_url = config["configurable"].get("rag_url")
+    # Monotonic clock for durations (immune to wall-clock jumps)
+    loop = asyncio.get_running_loop()
 
     # Determine which sources to query
     kdb_allowed = (use_kdb is True) or KDB_ENABLED
@@ -325,10 +539,10 @@ async def process_single_query(
 
         # Define async tasks for parallel execution
         async def search_kdb_async():
-            kdb_start = time.time()
+            kdb_start = loop.time()
             try:
                 answer, citation, record_count = await search_kdb_nat_with_fallback(query, writer, None)
-                duration = time.time() - kdb_start
+                duration = loop.time() - kdb_start
                 return SourceResult(
                     source='kdb',
                     content=answer or "",
@@ -338,13 +552,13 @@ async def process_single_query(
                 )
             except Exception as e:
                 logger.error(f"KDB+ search failed: {e}")
-                return SourceResult(source='kdb', content="", citation="", duration_seconds=time.time() - kdb_start)
+                return SourceResult(source='kdb', content="", citation="", duration_seconds=loop.time() - kdb_start)
 
         async def search_rag_async():
-            rag_start = time.time()
+            rag_start = loop.time()
             try:
                 answer, citation, doc_count = await fetch_query_results(rag_url, query, writer, collection)
-                duration = time.time() - rag_start
+                duration = loop.time() - rag_start
                 return SourceResult(
                     source='rag',
                     content=answer or "",
@@ -354,57 +568,81 @@ async def process_single_query(
                 )
             except Exception as e:
                 logger.error(f"RAG search failed: {e}")
-                return SourceResult(source='rag', content="", citation="", duration_seconds=time.time() - rag_start)
-
-        # Execute both searches in parallel
-        kdb_result, rag_result = await asyncio.gather(search_kdb_async(), search_rag_async())
-
-        # Stream individual results
-        if kdb_result.content:
-            duration_str = format_duration(kdb_result.duration_seconds)
-            record_info = f"{kdb_result.record_count} records" if kdb_result.record_count else "query complete"
-            writer({"kdb_answer": f"[{duration_str}, {record_info}]\n{kdb_result.citation}"})
-
-        if rag_result.content:
-            duration_str = format_duration(rag_result.duration_seconds)
-            doc_info = f"{rag_result.record_count} docs" if rag_result.record_count else "search complete"
-            writer({"rag_answer": f"[{duration_str}, {doc_info}]\n{rag_result.citation}"})
-
-        # Check relevancy for both results
-        if kdb_result.content:
-            kdb_relevancy = await check_relevancy(llm, query, kdb_result.content, writer)
-            kdb_result.is_relevant = kdb_relevancy.get("score") == "yes"
-
-        if rag_result.content:
-            rag_relevancy = await check_relevancy(llm, query, rag_result.content, writer)
-            rag_result.is_relevant = rag_relevancy.get("score") == "yes"
-
-        # Merge results from both sources
-        merged_content, merged_citation = merge_hybrid_results(kdb_result, rag_result, query)
-
-        # Determine overall relevancy
-        overall_relevant = kdb_result.is_relevant or rag_result.is_relevant
-        relevancy = {"score": "yes" if overall_relevant else "no"}
-
-        # Log hybrid search outcome
-        sources_used = []
-        if kdb_result.content and kdb_result.is_relevant:
-            sources_used.append("KDB+")
-        if rag_result.content and rag_result.is_relevant:
-            sources_used.append("RAG")
-        logger.info(f"HYBRID SEARCH complete. Sources used: {', '.join(sources_used) or 'None relevant'}")
-        writer({"hybrid_search": f"Merged results from: {', '.join(sources_used) or 'searching web fallback...'}"})
-
-        # Web search fallback if neither source was relevant
-        web_answer, web_citation = None, None
-        if search_web and not overall_relevant:
-            web_answer, web_citation = await _perform_web_search(query, writer)
+                return SourceResult(source='rag', content="", citation="", duration_seconds=loop.time() - rag_start)
+
+        def stream_result(result: SourceResult):
+            if not result.content:
+                return
+            duration_str = format_duration(result.duration_seconds)
+            if result.source == 'kdb':
+                record_info = f"{result.record_count} records" if result.record_count else "query complete"
+                writer({"kdb_answer": f"[{duration_str}, {record_info}]\n{result.citation}"})
+            else:
+                doc_info = f"{result.record_count} docs" if result.record_count else "search complete"
+                writer({"rag_answer": f"[{duration_str}, {doc_info}]\n{result.citation}"})
+
+        # Execute both searches in parallel and stream each result as soon as it finishes.
+        # The TaskGroup cancels the other search if this request is cancelled.
+        async with asyncio.TaskGroup() as tg:
+            kdb_task = tg.create_task(search_kdb_async())
+            rag_task = tg.create_task(search_rag_async())
+            for next_done in asyncio.as_completed((kdb_task, rag_task)):
+                stream_result(await next_done)
+        kdb_result, rag_result = kdb_task.result(), rag_task.result()
+
+        # Optionally overlap the web fallback with the relevancy checks (see sequential mode)
+        web_task, web_messages = None, []
+        if search_web and speculative_web:
+            web_task = asyncio.create_task(_perform_web_search(query, web_messages.append))
+
+        try:
+            # Check relevancy with one LLM call when both sources answered
+            to_check = [result for result in (kdb_result, rag_result) if result.content]
+            if len(to_check) == 2:
+                relevancies = await check_relevancy_pair(
+                    llm, query, kdb_result.content, rag_result.content, writer
+                )
+            else:
+                relevancies = [await check_relevancy(llm, query, result.content, writer) for result in to_check]
+            for result, result_relevancy in zip(to_check, relevancies):
+                result.is_relevant = result_relevancy.get("score") == "yes"
+
+            # Merge results from both sources
+            merged_content, merged_citation = merge_hybrid_results(kdb_result, rag_result, query)
+
+            # Determine overall relevancy
+            overall_relevant = kdb_result.is_relevant or rag_result.is_relevant
+            relevancy = {"score": "yes" if overall_relevant else "no"}
+
+            # Log hybrid search outcome
+            sources_used = []
+            if kdb_result.content and kdb_result.is_relevant:
+                sources_used.append("KDB+")
+            if rag_result.content and rag_result.is_relevant:
+                sources_used.append("RAG")
+            logger.info(f"HYBRID SEARCH complete. Sources used: {', '.join(sources_used) or 'None relevant'}")
+            writer({"hybrid_search": f"Merged results from: {', '.join(sources_used) or 'searching web fallback...'}"})
+
+            # Web search fallback if neither source was relevant
+            web_answer, web_citation = None, None
+            if search_web and not overall_relevant:
+                if web_task is not None:
+                    web_answer, web_citation = await web_task
+                    for message in web_messages:
+                        writer(message)
+                else:
+                    web_answer, web_citation = await _perform_web_search(query, writer)
+            elif web_task is not None:
+                logger.info("Hybrid results relevant, discarding speculative web search")
+        finally:
+            if web_task is not None:
+                _discard_task(web_task)
 
         return merged_content, merged_citation, relevancy, web_answer, web_citation
 
     # Sequential mode (legacy behavior) or single-source queries
     # Classify query to determine best data source
-    query_type = await classify_query_type(query, llm, use_kdb=use_kdb)
+    query_type = _classify_query_type_fast(query, use_kdb=use_kdb)
 
     # Try KDB+ first for financial/time-series queries (or when explicitly enabled)
     kdb_answer, kdb_citation, kdb_relevancy = None, None, None
@@ -412,11 +650,11 @@ async def process_single_query(
     if query_type == "kdb" and kdb_enabled:
         logger.info(f"Routing query to KDB+ (query_type={query_type}): {query[:50]}...")
         logger.info("Using intelligent MCP client for KDB+")
-        kdb_start = time.time()
+        kdb_start = loop.time()
         kdb_answer, kdb_citation, kdb_record_count = await search_kdb_nat_with_fallback(
             query, writer, None
         )
-        kdb_duration = time.time() - kdb_start
+        kdb_duration = loop.time() - kdb_start
 
         if kdb_answer:
             duration_str = format_duration(kdb_duration)
@@ -431,9 +669,9 @@ async def process_single_query(
 
     # Process RAG search if collection is specified
     if rag_enabled:
-        rag_start = time.time()
+        rag_start = loop.time()
         rag_answer, rag_citation, rag_doc_count = await fetch_query_results(rag_url, query, writer, collection)
-        rag_duration = time.time() - rag_start
+        rag_duration = loop.time() - rag_start
         duration_str = format_duration(rag_duration)
         doc_info = f"{rag_doc_count} docs" if rag_doc_count else "search complete"
         writer({"rag_answer": f"[{duration_str}, {doc_info}]\n{rag_citation}"})
@@ -447,17 +685,42 @@ async def process_single_query(
             rag_answer = "No data source available for this query. Please select a RAG collection or enable KDB+."
             rag_citation = ""
 
-    # Check relevancy for RAG answer
-    relevancy = await check_relevancy(llm, query, rag_answer, writer)
+    # The web query depends only on the query, so it can run while relevancy is checked.
+    # Its progress messages are buffered and only streamed if the result is used.
+    web_task, web_messages = None, []
+    if search_web and speculative_web:
+        web_task = asyncio.create_task(_perform_web_search(query, web_messages.append))
 
-    # Web search fallback
-    web_answer, web_citation = None, None
-    if search_web and relevancy["score"] == "no":
-        web_answer, web_citation = await _perform_web_search(query, writer)
+    try:
+        # Check relevancy for RAG answer
+        relevancy = await check_relevancy(llm, query, rag_answer, writer)
+
+        # Web search fallback
+        web_answer, web_citation = None, None
+        if search_web and relevancy["score"] == "no":
+            if web_task is not None:
+                web_answer, web_citation = await web_task
+                for message in web_messages:
+                    writer(message)
+            else:
+                web_answer, web_citation = await _perform_web_search(query, writer)
+        elif web_task is not None:
+            logger.info("RAG answer relevant, discarding speculative web search")
+    finally:
+        if web_task is not None:
+            _discard_task(web_task)
 
     return rag_answer, rag_citation, relevancy, web_answer, web_citation
 
 
+def _discard_task(task: asyncio.Task):
+    """Cancel a speculative task that is no longer needed, or retrieve its exception if it already failed."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
 async def _perform_web_search(query: str, writer: StreamWriter) -> Tuple[Optional[str], Optional[str]]:
     """
     Perform web search as a fallback when other sources don't have relevant results.
@@ -465,42 +728,44 @@ async def _perform_web_search(query: str, writer: StreamWriter) -> Tuple[Optiona
     Returns:
         Tuple of (web_answer, web_citation)
     """
-    web_start = time.time()
+    loop = asyncio.get_running_loop()
+    web_start = loop.time()
     web_result_count = 0
 
     result = await search_tavily(query, writer)
-    web_duration = time.time() - web_start
+    web_duration = loop.time() - web_start
 
     if result is not None:
-        web_result_count = len([r for r in result if 'score' in r and float(r['score']) > 0.6])
-
-        web_answers = [
-            res['content'] if 'score' in res and float(res['score']) > 0.6 else ""
-            for res in result
-        ]
-
-        web_citations = [
-            f"""
+        # Single pass over the results, parsing each score once. Results at or below 0.6
+        # still contribute an empty entry, so the joined text keeps its newline layout
+        web_answers = []
+        web_citations = []
+        for res in result:
+            if 'score' not in res or float(res['score']) <= 0.6:
+                web_answers.append("")
+                web_citations.append("")
+                continue
+            web_result_count += 1
+            content = res['content']
+            web_answers.append(content)
+            web_citations.append(f"""
 ---
 QUERY:
 {query}
 
 ANSWER:
-{res['content']}
+{content}
 
 CITATION:
 {res['url'].strip()}
 
-"""
-            if 'score' in res and float(res['score']) > 0.6 else ""
-            for res in result
-        ]
+""")
 
         web_answer = "\n".join(web_answers)
         web_citation = "\n".join(web_citations)
 
-        # Guard against empty results
-        if bool(re.fullmatch(r"\n*", web_answer)):
+        # Guard against empty results (only newline separators left)
+        if not web_answer.strip("\n"):
             web_answer = "No relevant result found in web search"
             web_citation = ""
     else:
@@ -102,6 +102,244 @@ class TestQueryClassification:
             assert query_type == "rag"
 
 
+class TestSourceResult:
+    """Test empty-response detection on source results."""
+
+    def test_is_empty(self):
+        """Short error-like answers are empty; long answers never are."""
+        from aiq_aira.search_utils import SourceResult
+
+        assert SourceResult(source="kdb", content="", citation="").is_empty()
+        assert SourceResult(source="kdb", content="No Data found for AAPL", citation="").is_empty()
+        assert not SourceResult(source="rag", content="AAPL closed at 190.5", citation="").is_empty()
+        assert not SourceResult(source="rag", content="error " + "x" * 200, citation="").is_empty()
+
+
+class TestRelevancyCache:
+    """Test that repeated relevancy checks skip the LLM."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_check_uses_cache(self):
+        """Second identical check returns the cached score without an LLM call."""
+        from aiq_aira import search_utils
+
+        search_utils._relevancy_cache.clear()
+        llm = MagicMock()
+        llm.model_name = "test-model"
+        llm.ainvoke = AsyncMock(return_value=MagicMock(content='{"score": "no"}'))
+        writer = MagicMock()
+
+        first = await search_utils.check_relevancy(llm, "q", "a", writer)
+        second = await search_utils.check_relevancy(llm, "q", "a", writer)
+
+        assert first == second == {"score": "no"}
+        assert llm.ainvoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """The fallback score after an LLM error is not cached."""
+        from aiq_aira import search_utils
+
+        search_utils._relevancy_cache.clear()
+        llm = MagicMock()
+        llm.model_name = "test-model"
+        llm.ainvoke = AsyncMock(side_effect=RuntimeError("boom"))
+
+        assert await search_utils.check_relevancy(llm, "q", "a", MagicMock()) == {"score": "yes"}
+        assert not search_utils._relevancy_cache
+
+    def test_compiled_prompts_match_format(self):
+        """Pre-parsed relevancy prompts render exactly like str.format."""
+        from aiq_aira import search_utils
+        from aiq_aira.prompts import relevancy_checker, relevancy_checker_pair
+
+        doc = 'Close {price} was "190.5"'
+        assert search_utils._render_relevancy_prompt(query="q", document=doc) == \
+            relevancy_checker.format(query="q", document=doc)
+        assert search_utils._render_relevancy_pair_prompt(query="q", document_a=doc, document_b="b") == \
+            relevancy_checker_pair.format(query="q", document_a=doc, document_b="b")
+
+    @pytest.mark.asyncio
+    async def test_pair_check_uses_one_call(self):
+        """Two answers are scored with a single LLM call and cached individually."""
+        from aiq_aira import search_utils
+
+        search_utils._relevancy_cache.clear()
+        llm = MagicMock()
+        llm.model_name = "test-model"
+        llm.ainvoke = AsyncMock(
+            return_value=MagicMock(content='{"document_a": "yes", "document_b": "no"}')
+        )
+
+        scores = await search_utils.check_relevancy_pair(llm, "q", "kdb", "rag", MagicMock())
+
+        assert scores == ({"score": "yes"}, {"score": "no"})
+        assert llm.ainvoke.await_count == 1
+        assert await search_utils.check_relevancy(llm, "q", "rag", MagicMock()) == {"score": "no"}
+        assert llm.ainvoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_pair_check_falls_back_to_single_checks(self):
+        """An unparseable paired response falls back to one check per answer."""
+        from aiq_aira import search_utils
+
+        search_utils._relevancy_cache.clear()
+        llm = MagicMock()
+        llm.model_name = "test-model"
+        llm.ainvoke = AsyncMock(side_effect=[
+            MagicMock(content='{"score": "yes"}'),
+            MagicMock(content='{"score": "no"}'),
+            MagicMock(content='{"score": "yes"}'),
+        ])
+
+        writer = MagicMock()
+        scores = await search_utils.check_relevancy_pair(llm, "q", "kdb", "rag", writer)
+
+        assert llm.ainvoke.await_count == 3
+        assert sorted(score["score"] for score in scores) == ["no", "yes"]
+        started = {"relevancy_checker": "\n Starting relevancy check \n"}
+        assert [c.args[0] for c in writer.call_args_list].count(started) == 1
+
+
+class TestRagSession:
+    """Test the pooled RAG session lifecycle."""
+
+    def test_session_closed_with_its_loop(self):
+        """The per-loop session is reused within a loop and closed when the loop shuts down."""
+        from aiq_aira import search_utils
+
+        async def get_twice():
+            session = await search_utils._get_rag_session()
+            assert session is await search_utils._get_rag_session()
+            return session
+
+        session = asyncio.run(get_twice())
+        assert session.closed
+
+    def test_close_rag_sessions(self):
+        """close_rag_sessions closes the running loop's session; the next call creates a new one."""
+        from aiq_aira import search_utils
+
+        async def close_and_reopen():
+            session = await search_utils._get_rag_session()
+            await search_utils.close_rag_sessions()
+            assert session.closed
+            return await search_utils._get_rag_session() is not session
+
+        assert asyncio.run(close_and_reopen())
+
+
+class TestSpeculativeWebSearch:
+    """Test the web search started while the RAG answer's relevancy is checked."""
+
+    @staticmethod
+    async def _run(relevant: bool, web_started: list, web_cancelled: list):
+        from aiq_aira import search_utils
+
+        async def web_search(query, writer):
+            web_started.append(query)
+            writer({"web_answer": "streamed"})
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                web_cancelled.append(query)
+                raise
+            return "web", "web citation"
+
+        async def check_relevancy(llm, query, answer, writer):
+            await asyncio.sleep(0.01)  # let the speculative search start
+            return {"score": "yes" if relevant else "no"}
+
+        writer = MagicMock()
+        with patch.object(search_utils, "KDB_ENABLED", False), \
+                patch.object(search_utils, "fetch_query_results", AsyncMock(return_value=("rag", "cite", 1))), \
+                patch.object(search_utils, "check_relevancy", check_relevancy), \
+                patch.object(search_utils, "_perform_web_search", web_search):
+            result = await search_utils.process_single_query(
+                "q", {"configurable": {"rag_url": "x"}}, writer, "col", MagicMock(),
+                search_web=True, use_kdb=False, speculative_web=True
+            )
+            await asyncio.sleep(0)
+        return result, writer
+
+    @pytest.mark.asyncio
+    async def test_discarded_when_rag_relevant(self):
+        """A relevant RAG answer cancels the prefetched web search and drops its messages."""
+        started, cancelled = [], []
+        result, writer = await self._run(True, started, cancelled)
+
+        assert started == ["q"] and cancelled == ["q"]
+        assert result[3:] == (None, None)
+        assert {"web_answer": "streamed"} not in [c.args[0] for c in writer.call_args_list]
+
+    @pytest.mark.asyncio
+    async def test_used_when_rag_irrelevant(self):
+        """An irrelevant RAG answer uses the prefetched web result and replays its messages."""
+        started, cancelled = [], []
+        result, writer = await self._run(False, started, cancelled)
+
+        assert started == ["q"] and not cancelled
+        assert result[3:] == ("web", "web citation")
+        writer.assert_any_call({"web_answer": "streamed"})
+
+    @pytest.mark.asyncio
+    async def test_hybrid_cancelled_on_error(self):
+        """A failure after the hybrid relevancy check still cancels the prefetched web search."""
+        from aiq_aira import search_utils
+
+        cancelled = []
+
+        async def web_search(query, writer):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+
+        async def check_pair(llm, query, a, b, writer):
+            await asyncio.sleep(0.01)  # let the speculative search start
+            return {"score": "yes"}, {"score": "no"}
+
+        with patch.object(search_utils, "_mcp_available", True), \
+                patch.object(search_utils, "search_kdb_nat_with_fallback", AsyncMock(return_value=("kdb", "", 1))), \
+                patch.object(search_utils, "fetch_query_results", AsyncMock(return_value=("rag", "", 1))), \
+                patch.object(search_utils, "check_relevancy_pair", check_pair), \
+                patch.object(search_utils, "merge_hybrid_results", MagicMock(side_effect=RuntimeError("boom"))), \
+                patch.object(search_utils, "_perform_web_search", web_search):
+            with pytest.raises(RuntimeError):
+                await search_utils.process_single_query(
+                    "q", {"configurable": {"rag_url": "x"}}, MagicMock(), "col", MagicMock(),
+                    search_web=True, use_kdb=True, speculative_web=True
+                )
+            await asyncio.sleep(0)
+
+        assert cancelled == ["q"]
+
+
+class TestWebSearchAnswer:
+    """Test assembly of the web search answer from Tavily results."""
+
+    @pytest.mark.asyncio
+    async def test_low_scores_keep_newline_layout(self):
+        """Results at or below the score threshold leave empty entries in the joined text."""
+        from aiq_aira import search_utils
+
+        results = [
+            {"score": "0.9", "content": "first", "url": " https://a "},
+            {"score": "0.2", "content": "skipped", "url": "https://b"},
+            {"content": "unscored", "url": "https://c"},
+            {"score": "0.8", "content": "second", "url": "https://d"},
+        ]
+        writer = MagicMock()
+        with patch.object(search_utils, "search_tavily", AsyncMock(return_value=results)):
+            answer, citation = await search_utils._perform_web_search("q", writer)
+
+        assert answer == "first\n\n\nsecond"
+        cite = "\n---\nQUERY:\nq\n\nANSWER:\n{}\n\nCITATION:\n{}\n\n"
+        assert citation == "\n".join([cite.format("first", "https://a"), "", "", cite.format("second", "https://d")])
+        assert "2 results" in writer.call_args.args[0]["web_answer"]
+
+
 class TestKDBNATClient:
     """Test KDB+ NAT MCP client functionality."""
 
@@ -140,17 +378,88 @@ class TestKDBNATClient:
             pass  # Test passes if no exception is raised
 
 
+class TestLLMResponseCache:
+    """Test the prompt-keyed LLM response cache."""
+
+    @pytest.mark.asyncio
+    async def test_identical_prompt_reuses_response(self):
+        """A repeated prompt is answered from cache without a second LLM call."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        llm = MagicMock(model_name="test-model")
+        llm.ainvoke = AsyncMock(return_value=MagicMock(content="answer"))
+
+        assert await client._cached_ainvoke(llm, "prompt", ttl=60) == "answer"
+        assert await client._cached_ainvoke(llm, "prompt", ttl=60) == "answer"
+        assert llm.ainvoke.await_count == 1
+
+        await client._cached_ainvoke(llm, "other prompt", ttl=60)
+        assert llm.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_bypasses_cache(self):
+        """A TTL of zero always calls the LLM."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        llm = MagicMock(model_name="test-model")
+        llm.ainvoke = AsyncMock(return_value=MagicMock(content="answer"))
+
+        await client._cached_ainvoke(llm, "prompt", ttl=0)
+        await client._cached_ainvoke(llm, "prompt", ttl=0)
+        assert llm.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_endpoint_and_sampling_are_part_of_key(self):
+        """Clients sharing a model name but not an endpoint or temperature do not share answers."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        llms = [
+            MagicMock(model_name="m", openai_api_base="http://a/v1", temperature=0.0, top_p=None, max_tokens=100),
+            MagicMock(model_name="m", openai_api_base="http://b/v1", temperature=0.0, top_p=None, max_tokens=100),
+            MagicMock(model_name="m", openai_api_base="http://a/v1", temperature=0.7, top_p=None, max_tokens=100),
+        ]
+        for i, llm in enumerate(llms):
+            llm.ainvoke = AsyncMock(return_value=MagicMock(content=f"answer {i}"))
+
+        answers = [await client._cached_ainvoke(llm, "prompt", ttl=60) for llm in llms]
+
+        assert answers == ["answer 0", "answer 1", "answer 2"]
+
+    @pytest.mark.asyncio
+    async def test_rejected_response_not_cached(self):
+        """A response rejected by cache_if is returned but the next call asks the LLM again."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        llm = MagicMock(model_name="test-model")
+        llm.ainvoke = AsyncMock(side_effect=[
+            MagicMock(content="not a plan"),
+            MagicMock(content='{"steps": []}'),
+        ])
+
+        first = await client._cached_ainvoke(llm, "prompt", ttl=60, cache_if=client._is_parseable_plan)
+        second = await client._cached_ainvoke(llm, "prompt", ttl=60, cache_if=client._is_parseable_plan)
+        third = await client._cached_ainvoke(llm, "prompt", ttl=60, cache_if=client._is_parseable_plan)
+
+        assert (first, second, third) == ("not a plan", '{"steps": []}', '{"steps": []}')
+        assert llm.ainvoke.await_count == 2
+
+
 class TestMCPToolDiscovery:
     """Test MCP tool discovery functionality."""
 
     def test_tool_description_builder(self):
         """Test that tool descriptions are properly formatted."""
-        from aiq_aira.kdb_tools_nat import KDBNATClient
+        from aiq_aira.kdb_tools_nat import CachedTool, KDBNATClient
 
         client = KDBNATClient()
 
         # Mock tools
         mock_tool = MagicMock()
+        mock_tool.name = "kdbx_run_sql_query"
         mock_tool.description = "Execute SQL queries against the database"
         mock_tool.inputSchema = {
             "type": "object",
@@ -160,7 +469,7 @@ class TestMCPToolDiscovery:
             "required": ["query"]
         }
 
-        client._tools = {"kdbx_run_sql_query": mock_tool}
+        client._tools = {"kdbx_run_sql_query": CachedTool.from_tool(mock_tool)}
 
         description = client._build_tools_description()
 
@@ -168,6 +477,362 @@ class TestMCPToolDiscovery:
         assert "SQL" in description
 
 
+class TestPlanStepGrouping:
+    """Test grouping of planned tool steps into concurrent waves."""
+
+    def test_independent_steps_share_a_wave(self):
+        """Steps without dependencies all run in the first wave."""
+        from aiq_aira.kdb_tools_nat import _group_plan_steps
+
+        steps = [{"tool": "a"}, {"tool": "b"}, {"tool": "c"}]
+        assert _group_plan_steps(steps) == [[0, 1, 2]]
+
+    def test_dependent_steps_run_after_their_dependencies(self):
+        """Steps listing depends_on are placed after the steps they need."""
+        from aiq_aira.kdb_tools_nat import _group_plan_steps
+
+        steps = [
+            {"tool": "a"},
+            {"tool": "b", "depends_on": [0]},
+            {"tool": "c"},
+            {"tool": "d", "depends_on": [1, 2]},
+        ]
+        assert _group_plan_steps(steps) == [[0, 2], [1], [3]]
+
+    def test_invalid_dependencies_are_ignored(self):
+        """Forward, self and malformed references do not delay a step."""
+        from aiq_aira.kdb_tools_nat import _group_plan_steps
+
+        steps = [{"tool": "a", "depends_on": [1]}, {"tool": "b", "depends_on": ["x", 1]}]
+        assert _group_plan_steps(steps) == [[0, 1]]
+        assert _group_plan_steps([]) == []
+
+
+class TestExtractJson:
+    """Test JSON extraction from LLM output."""
+
+    def test_skips_think_blocks_and_code_fences(self):
+        """Braces inside think tags are ignored and fenced JSON is found."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        text = '<THINK>maybe {"steps": []}</think>\n```json\n{"steps": [{"tool": "a"}]}\n```'
+        assert json.loads(client._extract_json(text)) == {"steps": [{"tool": "a"}]}
+
+    def test_fenced_block_preferred_over_prose_object(self):
+        """An example object in prose before the fenced answer is not returned."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        text = 'Steps look like {"tool": "name"}.\n```json\n{"steps": [{"tool": "a"}]}\n```'
+        assert json.loads(client._extract_json(text)) == {"steps": [{"tool": "a"}]}
+
+    def test_braces_and_quotes_inside_strings(self):
+        """Braces and escaped quotes inside string values do not end the object."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        payload = {"reasoning": 'use "}" and {x}', "steps": []}
+        text = f"Plan: {json.dumps(payload)} done"
+        assert json.loads(client._extract_json(text)) == payload
+
+    def test_unclosed_think_and_missing_json(self):
+        """Unclosed think tags and text without an object yield None."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        assert client._extract_json('<think>{"steps": []}') is None
+        assert client._extract_json("no json here") is None
+
+
+class TestCleanGeneratedSql:
+    """Test cleanup of LLM-generated SQL."""
+
+    def test_fences_and_quotes_removed(self):
+        """Markdown fences and surrounding quotes are dropped."""
+        from aiq_aira.kdb_tools_nat import _clean_generated_sql
+
+        assert _clean_generated_sql('```sql\n"SELECT * FROM trade"\n```') == "SELECT * FROM trade"
+
+    def test_escaped_quotes_unescaped_before_strip(self):
+        """A query wrapped in escaped quotes comes out bare; inner escapes are unescaped."""
+        from aiq_aira.kdb_tools_nat import _clean_generated_sql
+
+        assert _clean_generated_sql('\\"SELECT * FROM trade\\"') == "SELECT * FROM trade"
+        text = 'SELECT * FROM trade WHERE sym = \\"AAPL\\" LIMIT 5'
+        assert _clean_generated_sql(text) == 'SELECT * FROM trade WHERE sym = "AAPL" LIMIT 5'
+
+
+class TestJsonDumps:
+    """Test JSON serialization of query results for prompts and citations."""
+
+    def test_wide_integers_fall_back_to_stdlib(self):
+        """Integers wider than 64 bits serialize instead of raising."""
+        from aiq_aira.kdb_tools_nat import _json_dumps
+
+        rows = [{"sym": "AAPL", "volume": 2 ** 70}]
+        assert json.loads(_json_dumps(rows, indent=True)) == rows
+        assert json.loads(_json_dumps({"limit": 10})) == {"limit": 10}
+
+    @pytest.mark.asyncio
+    async def test_simple_answer_with_wide_integer(self):
+        """A result row with a wide integer still reaches the LLM prompt."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        client._ainvoke = AsyncMock(return_value=" AAPL traded a lot. ")
+
+        answer = await client._generate_simple_answer(
+            "AAPL volume?", "SELECT volume FROM trade", [{"volume": 2 ** 70}], 1, MagicMock()
+        )
+
+        assert answer == "AAPL traded a lot."
+        assert str(2 ** 70) in client._ainvoke.await_args.args[1]
+
+
+class TestCitations:
+    """Test citation text for intelligent query results."""
+
+    def test_arguments_formatted_like_json_dumps(self):
+        """Tool arguments are shown with json.dumps' spaced separators."""
+        from aiq_aira.kdb_tools_nat import _format_intelligent_citations
+
+        arguments = {"query": "SELECT * FROM trade", "limit": 10}
+        citations, _ = _format_intelligent_citations("q", [{"tool": "t", "arguments": arguments, "content": []}])
+
+        assert f"  Arguments: {json.dumps(arguments)}" in citations
+
+
+class TestResultRows:
+    """Test decoding of rows from MCP query results."""
+
+    def test_rows_decoded_lazily_per_content_item(self):
+        """First-row extractors stop before decoding later content items."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient, _iter_result_rows
+
+        result = {"content": [
+            {"type": "text", "text": json.dumps({"data": json.dumps([{"sym": "AAPL", "row_count": 3}])})},
+            {"type": "text", "text": "not json"},
+            {"type": "text", "text": json.dumps({"data": [{"sym": "MSFT"}, {"sym": "AAPL"}]})},
+        ]}
+        rows = _iter_result_rows(result)
+        assert next(rows) == {"sym": "AAPL", "row_count": 3}
+
+        client = KDBNATClient()
+        assert client._extract_single_value(result, "row_count") == 3
+        assert client._extract_columns_from_result(result) == ["sym", "row_count"]
+        assert client._extract_column_values(result, "sym") == ["AAPL", "MSFT"]
+        assert client._extract_date_range({"content": []}) == {}
+
+
+class TestSpeculativeSchemaCall:
+    """Test the speculative schema tool call started with the first plan."""
+
+    @pytest.mark.asyncio
+    async def test_speculative_result_reused_when_plan_matches(self):
+        """A planned describe-tables step reuses the speculative call instead of repeating it."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient, CachedTool
+
+        client = KDBNATClient()
+        client._initialized = True
+        client._data_content_discovered = True
+        tool = MagicMock(description="Describe tables", inputSchema={})
+        tool.name = "kdbx_describe_tables"
+        client._tools = {"kdbx_describe_tables": CachedTool.from_tool(tool)}
+        client.call_tool = AsyncMock(return_value={"tool": "kdbx_describe_tables", "content": []})
+        client._plan_tool_usage = AsyncMock(return_value={
+            "steps": [{"tool": "kdbx_describe_tables", "arguments": {}, "purpose": "list data"}]
+        })
+        client._synthesize_results = AsyncMock(return_value="done")
+
+        answer, results = await client.intelligent_query("what data is there?", llm=MagicMock())
+
+        assert answer == "done"
+        assert len(results) == 1
+        client.call_tool.assert_awaited_once_with("kdbx_describe_tables", {})
+
+    @pytest.mark.asyncio
+    async def test_speculative_call_cancelled_when_data_unavailable(self):
+        """An early return on data_available=False cancels a matched speculative call."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient, CachedTool
+
+        client = KDBNATClient()
+        client._initialized = True
+        client._data_content_discovered = True
+        tool = MagicMock(description="Describe tables", inputSchema={})
+        tool.name = "kdbx_describe_tables"
+        client._tools = {"kdbx_describe_tables": CachedTool.from_tool(tool)}
+        cancelled = asyncio.Event()
+
+        async def slow_call(tool_name, arguments):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def plan(*args, **kwargs):
+            await asyncio.sleep(0.01)  # let the speculative call start
+            return {
+                "data_available": False,
+                "reasoning": "No such data",
+                "steps": [{"tool": "kdbx_describe_tables", "arguments": {}, "purpose": "list data"}]
+            }
+
+        client.call_tool = slow_call
+        client._plan_tool_usage = plan
+
+        answer, results = await client.intelligent_query("what data is there?", llm=MagicMock())
+
+        assert answer == "No such data"
+        assert results == []
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+class TestDataContentDiscovery:
+    """Test background data content discovery."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_waiters_share_one_discovery(self):
+        """Concurrent queries await a single discovery task."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+
+        async def fake_discover():
+            await asyncio.sleep(0)
+            client._data_content_discovered = True
+            return {}
+
+        client.discover_data_content = AsyncMock(side_effect=fake_discover)
+        await asyncio.gather(client._ensure_data_content(), client._ensure_data_content())
+
+        assert client.discover_data_content.await_count == 1
+        assert client._data_content_discovered
+
+    @pytest.mark.asyncio
+    async def test_waiter_rediscovers_after_refresh(self):
+        """A query waiting on discovery restarts it when refresh_schema() cancels it."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        client._discover_schema = AsyncMock()
+
+        async def fake_discover():
+            await asyncio.sleep(0.01)
+            client._data_content_discovered = True
+            return {}
+
+        client.discover_data_content = AsyncMock(side_effect=fake_discover)
+        waiter = asyncio.create_task(client._ensure_data_content())
+        await asyncio.sleep(0)
+        await client.refresh_schema()
+        await waiter
+
+        assert client.discover_data_content.call_count == 2
+        assert client._data_content_discovered
+
+    @pytest.mark.asyncio
+    async def test_failed_background_discovery_is_logged_and_cleared(self):
+        """A failed discovery nobody awaited is logged and retried by the next query."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+
+        async def fake_discover():
+            if client.discover_data_content.call_count == 1:
+                raise RuntimeError("MCP server unavailable")
+            client._data_content_discovered = True
+            return {}
+
+        client.discover_data_content = AsyncMock(side_effect=fake_discover)
+        with patch('aiq_aira.kdb_tools_nat.logger') as mock_logger:
+            task = client._start_data_content_discovery()
+            await asyncio.wait([task])
+            await asyncio.sleep(0)  # let done callbacks run
+
+            assert "MCP server unavailable" in mock_logger.warning.call_args.args[0]
+        assert not client._data_content_tasks
+
+        await client._ensure_data_content()
+        assert client.discover_data_content.call_count == 2
+        assert client._data_content_discovered
+
+    def test_event_loops_do_not_share_primitives(self):
+        """The shared client can be used from successive event loops."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient, KDB_LLM_MAX_CONCURRENCY
+
+        client = KDBNATClient()
+
+        async def fake_discover():
+            await asyncio.sleep(0)
+            return {}
+
+        client.discover_data_content = AsyncMock(side_effect=fake_discover)
+
+        async def use_client():
+            await client._ensure_data_content()
+            semaphore = client._llm_semaphore
+
+            async def hold():
+                async with semaphore:
+                    await asyncio.sleep(0)
+
+            # Contention binds the semaphore to this loop
+            await asyncio.gather(*(hold() for _ in range(KDB_LLM_MAX_CONCURRENCY + 1)))
+            return semaphore
+
+        assert asyncio.run(use_client()) is not asyncio.run(use_client())
+        assert client.discover_data_content.await_count == 2
+
+
+class TestDefaultLLM:
+    """Test reuse of the default LLM client."""
+
+    @pytest.mark.asyncio
+    async def test_default_llm_reused_until_config_changes(self):
+        """The same client is returned until the model configuration changes."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        with patch.dict(os.environ, {"INSTRUCT_MODEL_NAME": "model-a", "INSTRUCT_API_KEY": "test"}):
+            first = client._get_default_llm()
+            assert client._get_default_llm() is first
+        with patch.dict(os.environ, {"INSTRUCT_MODEL_NAME": "model-b", "INSTRUCT_API_KEY": "test"}):
+            assert client._get_default_llm() is not first
+
+
+class TestPromptContextMemoization:
+    """Test memoization of the formatted prompt context sections."""
+
+    def test_additional_context_rebuilt_after_version_bump(self):
+        """Cached context is reused until the context version changes."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        client._additional_context = {"notes": "x" * 2500}
+        first = client._format_additional_context()
+        assert first.startswith("### notes\n")
+        assert first.endswith("\n... (truncated)")
+
+        client._additional_context = {"other": "y"}
+        assert client._format_additional_context() is first
+
+        client._context_version += 1
+        assert client._format_additional_context() == "### other\ny"
+
+    def test_simple_chat_prompt_truncates_and_memoizes(self):
+        """The SQL system prompt truncates schema text and is reused until it changes."""
+        from aiq_aira.kdb_tools_nat import KDBNATClient
+
+        client = KDBNATClient()
+        client._schema_description = "s" * 3000
+        prompt = client._simple_chat_system_prompt()
+        assert "s" * 2000 + "\n" in prompt
+        assert "s" * 2001 not in prompt
+        assert client._simple_chat_system_prompt() is prompt
+
+
 class TestKDBKeywords:
     """Test that KDB keywords are comprehensive."""
 
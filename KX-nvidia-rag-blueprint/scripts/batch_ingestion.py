@@ -15,10 +15,11 @@
 """
 Batch Ingestion Script
 
-- Scans a folder and uploads documents to the ingestor-server in sequential batches
+- Scans a folder and uploads documents to the ingestor-server in batches (sequential by default)
 - Professional logging
 - Shows batch progress (e.g., "Uploading batch 2/43 ...")
 - Polls ingestion task until FINISHED, continues with next batch; on FAILED/UNKNOWN or any unexpected state, marks batch as failed
+- --concurrent-batches N keeps up to N batches uploading/ingesting at once
 
 Notes:
 - Can optionally create and/or delete collections via CLI flags.
@@ -28,18 +29,33 @@ Notes:
 import argparse
 import json
 import logging
-import math
 import os
 import sys
 import time
 from collections.abc import Iterable
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
 
 DEFAULT_PORT = 8082
-POLL_INTERVAL = 5  # seconds
+POLL_INTERVAL = 5  # seconds, retry delay after a failed status request
+POLL_INITIAL_INTERVAL = 0.5  # seconds, first delay between status polls
+POLL_MAX_INTERVAL = 30  # seconds, cap for the doubling poll delay
+POLL_LOG_INTERVAL = 600  # seconds between periodic status log lines
 POLL_TIMEOUT = 60 * 60 * 6  # 6 hours
+# Transport-level retries for idempotent calls (GET/DELETE); uploads are sent without them.
+# Once retries are exhausted the last response is returned, so callers still see its
+# status code and body instead of a RetryError.
+HTTP_RETRY = Retry(
+    total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), raise_on_status=False
+)
+UPLOAD_CONNECT_RETRIES = 3  # uploads are only re-sent when no connection was opened
 
 
 def configure_logger(verbosity: int) -> logging.Logger:
@@ -70,14 +86,23 @@ def chunked(iterable: list[Path], chunk_size: int) -> Iterable[list[Path]]:
 
 
 def discover_files(folder: Path, allowed_exts: tuple[str, ...]) -> list[Path]:
-    files: list[Path] = []
-    for root, _dirs, filenames in os.walk(folder):
-        for name in filenames:
-            p = Path(root) / name
-            if not allowed_exts or p.suffix.lower() in allowed_exts:
-                files.append(p)
-    files.sort()
-    return files
+    # Walk with os.scandir and filter on the entry name so Path objects are only
+    # built for matching files (directory symlinks are not followed, as with os.walk)
+    paths: list[str] = []
+    stack = [os.fspath(folder)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                elif not allowed_exts or os.path.splitext(entry.name)[1].lower() in allowed_exts:
+                    paths.append(entry.path)
+    return sorted(map(Path, paths))
 
 
 def form_documents_payload(
@@ -100,16 +125,38 @@ def form_documents_payload(
     }
 
 
+def _connect_failed(error: requests.exceptions.ConnectionError) -> bool:
+    """Whether a request failed before a connection was opened, so nothing was sent."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
 class IngestionClient:
     def __init__(
         self,
         base_url: str,
         logger: logging.Logger,
         poll_timeout: int | float | None = None,
+        pool_size: int = 1,
     ):
         self.base_url = base_url.rstrip("/")
         self.logger = logger
         self.poll_timeout = poll_timeout if poll_timeout is not None else POLL_TIMEOUT
+        # One pooled keep-alive session for all calls to the ingestor-server, with
+        # enough connections kept open for every concurrent batch
+        pool_maxsize = max(pool_size, DEFAULT_POOLSIZE)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=HTTP_RETRY)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Session without transport retries for calls that retry themselves: status
+        # polling, and uploads, whose streamed body cannot be replayed by urllib3
+        self.no_retry_session = requests.Session()
+        no_retry_adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.no_retry_session.mount("http://", no_retry_adapter)
+        self.no_retry_session.mount("https://", no_retry_adapter)
 
     def create_collection(
         self,
@@ -125,7 +172,7 @@ class IngestionClient:
             "metadata_schema": metadata_schema or [],
         }
         try:
-            resp = requests.post(url, json=payload, timeout=60)
+            resp = self.session.post(url, json=payload, timeout=60)
             if resp.status_code >= 400:
                 try:
                     self.logger.error(
@@ -142,7 +189,7 @@ class IngestionClient:
         """Delete collections using DELETE /v1/collections with JSON body [names]."""
         url = f"{self.base_url}/v1/collections"
         try:
-            resp = requests.delete(url, json=collection_names, timeout=60)
+            resp = self.session.delete(url, json=collection_names, timeout=60)
             if resp.status_code >= 400:
                 try:
                     self.logger.error(
@@ -160,7 +207,7 @@ class IngestionClient:
         url = f"{self.base_url}/v1/documents"
         params = {"collection_name": collection_name}
         try:
-            resp = requests.get(url, params=params, timeout=60)
+            resp = self.session.get(url, params=params, timeout=60)
             if resp.status_code >= 400:
                 try:
                     self.logger.error(
@@ -182,55 +229,66 @@ class IngestionClient:
         except Exception as e:
             raise RuntimeError(f"Failed to list documents: {e}") from e
 
-    def upload_documents(self, files: list[Path], payload: dict) -> dict:
+    def upload_documents(self, files: list[Path], payload: dict | bytes) -> dict:
         url = f"{self.base_url}/v1/documents"
-        files_form = []
-        try:
-            for p in files:
-                content_type = _guess_content_type(p)
-                files_form.append(
+        # payload may be passed already JSON-encoded so it is serialized once per run
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        for attempt in range(UPLOAD_CONNECT_RETRIES + 1):
+            # Each attempt streams a fresh multipart body from newly opened files
+            with ExitStack() as stack:
+                fields = [
                     (
                         "documents",
-                        (p.name, open(p, "rb"), content_type),
+                        (
+                            p.name,
+                            stack.enter_context(open(p, "rb")),
+                            _guess_content_type(p),
+                        ),
                     )
-                )
-            # Add the JSON payload as a multipart field named "data" with application/json
-            files_form.append(
-                (
-                    "data",
-                    (None, json.dumps(payload), "application/json"),
-                )
-            )
-
-            response = requests.post(url, files=files_form, timeout=300)
-            if response.status_code >= 400:
+                    for p in files
+                ]
+                # The JSON payload goes in a multipart field named "data"
+                fields.append(("data", (None, data, "application/json")))
+                body = MultipartEncoder(fields=fields)
                 try:
-                    err_text = response.text
-                except Exception:
-                    err_text = "<no response text>"
-                self.logger.error(
-                    f"Upload request failed with {response.status_code}: {err_text}"
-                )
-                response.raise_for_status()
-            return response.json()
-        finally:
-            for _field_name, file_tuple in files_form:
-                # file_tuple = (filename, fileobj, content_type)
-                try:
-                    file_tuple[1].close()
-                except Exception:
-                    pass
+                    response = self.no_retry_session.post(
+                        url,
+                        data=body,
+                        headers={"Content-Type": body.content_type},
+                        timeout=300,
+                    )
+                    break
+                except requests.exceptions.ConnectionError as e:
+                    if attempt == UPLOAD_CONNECT_RETRIES or not _connect_failed(e):
+                        raise
+                    self.logger.warning(
+                        f"Upload connection failed ({e}), retrying "
+                        f"({attempt + 1}/{UPLOAD_CONNECT_RETRIES})"
+                    )
+            time.sleep(HTTP_RETRY.backoff_factor * (2**attempt))
+        if response.status_code >= 400:
+            try:
+                err_text = response.text
+            except Exception:
+                err_text = "<no response text>"
+            self.logger.error(
+                f"Upload request failed with {response.status_code}: {err_text}"
+            )
+            response.raise_for_status()
+        return response.json()
 
-    def poll_task_status(self, task_id: str) -> dict:
+    def poll_task_status(self, task_id: str, spinner: bool = True) -> dict:
         url = f"{self.base_url}/v1/status"
         params = {"task_id": task_id}
         start_time = time.time()
         self.logger.info(f"    - ⏳ Polling task status for task_id: {task_id}")
         poll_success = True
         retries = 1
+        poll_interval = POLL_INITIAL_INTERVAL
+        next_log_at = POLL_LOG_INTERVAL
         spinner_frames = ["|", "/", "-", "\\"]
         spinner_idx = 0
-        spinner_enabled = sys.stdout.isatty()
+        spinner_enabled = spinner and sys.stdout.isatty()
         last_spinner_len = 0
 
         def draw_spinner():
@@ -276,7 +334,7 @@ class IngestionClient:
                 retries += 1
             try:
                 draw_spinner()
-                response = requests.get(url, params=params, timeout=60)
+                response = self.no_retry_session.get(url, params=params, timeout=60)
                 poll_success = True
             except Exception as e:
                 clear_spinner_line()
@@ -297,7 +355,8 @@ class IngestionClient:
                 status_json = {"state": "UNKNOWN", "raw": response.text}
 
             state = (status_json or {}).get("state")
-            if int(elapsed) % 600 < POLL_INTERVAL:
+            if elapsed >= next_log_at:
+                next_log_at += POLL_LOG_INTERVAL
                 clear_spinner_line()
                 self.logger.info(f"    - Task status after {elapsed:.0f}s: {state}")
 
@@ -328,7 +387,9 @@ class IngestionClient:
                 self.logger.error(f"    - Task timed out after {self.poll_timeout}s")
                 raise TimeoutError("Status polling timed out")
 
-            sleep_with_spinner(POLL_INTERVAL)
+            # Exponential back-off: fast tasks are seen quickly, long ones are polled rarely
+            sleep_with_spinner(poll_interval)
+            poll_interval = min(poll_interval * 2, POLL_MAX_INTERVAL)
 
 
 def _guess_content_type(path: Path) -> str:
@@ -350,6 +411,45 @@ def _guess_content_type(path: Path) -> str:
     return "application/octet-stream"
 
 
+def ingest_batch(
+    client: "IngestionClient",
+    file_batch: list[Path],
+    batch_label: str,
+    payload: dict | bytes,
+    logger: logging.Logger,
+    spinner: bool = True,
+) -> list[str]:
+    """Upload one batch and wait for its ingestion task; returns the names of files that failed."""
+    logger.info(f"⏳ Uploading {batch_label} with {len(file_batch)} file(s)...")
+
+    try:
+        response_json = client.upload_documents(file_batch, payload)
+    except Exception as e:
+        logger.exception(f"Failed to upload {batch_label}: {e}")
+        return [p.name for p in file_batch]
+
+    task_id = (
+        (response_json or {}).get("task_id")
+        or (response_json or {}).get("task")
+        or (response_json or {}).get("id")
+    )
+    if not task_id:
+        logger.error(
+            f"Could not find task id in response for {batch_label}: {response_json}"
+        )
+        return [p.name for p in file_batch]
+
+    logger.info(f"Started ingestion for {batch_label}; task_id={task_id}")
+
+    try:
+        client.poll_task_status(task_id, spinner=spinner)
+        logger.info(f"Completed {batch_label} ✅")
+    except Exception as e:
+        logger.error(f"{batch_label} failed during polling: {e}")
+        return [p.name for p in file_batch]
+    return []
+
+
 def _maybe_delete_collection_on_exit(
     client: "IngestionClient",
     collection_name: str,
@@ -366,7 +466,18 @@ def _maybe_delete_collection_on_exit(
         logger.error(f"❌ Could not delete collection: {e}")
 
 
-def parse_args() -> argparse.Namespace:
+def _positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Upload documents to ingestor-server in sequential batches",
     )
@@ -403,6 +514,12 @@ def parse_args() -> argparse.Namespace:
         default=100,
         help="Number of files per batch",
     )
+    parser.add_argument(
+        "--concurrent-batches",
+        type=_positive_int,
+        default=1,
+        help="Number of batches to upload and ingest at the same time (default: 1, sequential)",
+    )
     parser.add_argument(
         "--allowed-exts",
         nargs="*",
@@ -439,13 +556,24 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Override polling timeout in seconds (default: 6 hours)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--status-json",
+        default=None,
+        help="Write a JSON run summary (file and batch counts, failures, exit code) to this path",
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
-    logger = configure_logger(args.verbose)
+def write_status_json(path: str, status: dict) -> None:
+    """Write the run summary atomically so readers never see a partial file."""
+    target = Path(path).expanduser()
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(json.dumps(status, indent=2))
+    os.replace(tmp, target)
 
+
+def run(args: argparse.Namespace, logger: logging.Logger, status: dict) -> int:
+    """Run the ingestion described by args, recording counts in status; returns the exit code."""
     folder = Path(args.folder).expanduser().resolve()
     if not folder.exists() or not folder.is_dir():
         logger.error(f"Folder not found or not a directory: {folder}")
@@ -455,6 +583,7 @@ def main() -> int:
         e.lower() if e.startswith(".") else f".{e.lower()}" for e in args.allowed_exts
     )
     all_files = discover_files(folder, allowed_exts)
+    status["discovered_files"] = len(all_files)
     if not all_files:
         logger.warning(
             "No files discovered matching allowed extensions; nothing to upload."
@@ -463,7 +592,9 @@ def main() -> int:
 
     base_url = f"http://{args.ingestor_host}:{args.ingestor_port}"
     poll_timeout = args.poll_timeout if args.poll_timeout is not None else POLL_TIMEOUT
-    client = IngestionClient(base_url, logger, poll_timeout=poll_timeout)
+    client = IngestionClient(
+        base_url, logger, poll_timeout=poll_timeout, pool_size=args.concurrent_batches
+    )
 
     # Create collection at start if requested
     if args.create_collection:
@@ -494,58 +625,53 @@ def main() -> int:
         )
 
     total_files = len(files)
+    status["skipped_files"] = len(skipped)
+    status["total_files"] = total_files
     if total_files == 0:
         logger.info("All files are already ingested. Nothing to upload.")
         return 0
 
-    batches = list(chunked(files, args.upload_batch_size))
-    total_batches = len(batches)
+    # Ceiling division; batches are sliced lazily as they are uploaded
+    total_batches = (total_files + args.upload_batch_size - 1) // args.upload_batch_size
+    status["total_batches"] = total_batches
 
     logger.info(
         f"Discovered {total_files} files in {folder}. Uploading in {total_batches} batch(es) of up to {args.upload_batch_size}."
     )
 
     failures: list[str] = []
-    for batch_index, file_batch in enumerate(batches, start=1):
-        batch_label = f"batch {batch_index}/{total_batches}"
-        logger.info(f"⏳ Uploading {batch_label} with {len(file_batch)} file(s)...")
-
-        payload = form_documents_payload(
+    status["failed_files"] = failures
+    # Batches are independent ingestion tasks; with --concurrent-batches > 1 several
+    # are in flight at once on the shared sessions. The spinner only makes sense
+    # when a single task is being polled.
+    spinner = args.concurrent_batches == 1
+    # Every batch sends the same options, so encode the "data" part once
+    payload = json.dumps(
+        form_documents_payload(
             collection_name=args.collection_name,
             blocking=False,
             split_chunk_size=args.split_chunk_size,
             split_chunk_overlap=args.split_chunk_overlap,
             generate_summary=args.generate_summary,
         )
-
-        try:
-            response_json = client.upload_documents(file_batch, payload)
-        except Exception as e:
-            logger.exception(f"Failed to upload {batch_label}: {e}")
-            failures.extend([p.name for p in file_batch])
-            continue
-
-        task_id = (
-            (response_json or {}).get("task_id")
-            or (response_json or {}).get("task")
-            or (response_json or {}).get("id")
-        )
-        if not task_id:
-            logger.error(
-                f"Could not find task id in response for {batch_label}: {response_json}"
+    ).encode()
+    with ThreadPoolExecutor(max_workers=args.concurrent_batches) as pool:
+        futures = [
+            pool.submit(
+                ingest_batch,
+                client,
+                file_batch,
+                f"batch {batch_index}/{total_batches}",
+                payload,
+                logger,
+                spinner,
             )
-            failures.extend([p.name for p in file_batch])
-            continue
-
-        logger.info(f"Started ingestion for {batch_label}; task_id={task_id}")
-
-        try:
-            client.poll_task_status(task_id)
-            logger.info(f"Completed {batch_label} ✅")
-        except Exception as e:
-            logger.error(f"{batch_label} failed during polling: {e}")
-            failures.extend([p.name for p in file_batch])
-            continue
+            for batch_index, file_batch in enumerate(
+                chunked(files, args.upload_batch_size), start=1
+            )
+        ]
+        for future in futures:
+            failures.extend(future.result())
 
     exit_code = 0
     if failures:
@@ -564,5 +690,27 @@ def main() -> int:
     return exit_code
 
 
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logger = configure_logger(args.verbose)
+    status: dict = {"collection_name": args.collection_name, "error": None}
+    exit_code = 1
+    try:
+        exit_code = run(args, logger, status)
+    except BaseException as e:
+        # Still record the run (e.g. connection refused mid-run, Ctrl-C) before propagating
+        status["error"] = f"{type(e).__name__}: {e}"
+        exit_code = 130 if isinstance(e, KeyboardInterrupt) else 1
+        raise
+    finally:
+        if args.status_json:
+            status["exit_code"] = exit_code
+            try:
+                write_status_json(args.status_json, status)
+            except OSError as e:
+                logger.error(f"Could not write status JSON to {args.status_json}: {e}")
+    return exit_code
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -7,11 +7,16 @@ Usage:
     python download_sec_filings.py BA                 # Download only Boeing
     python download_sec_filings.py BA NVDA AAPL      # Download specific companies
     python download_sec_filings.py --list            # List available companies
+    python download_sec_filings.py --revalidate      # Refresh changed filings
 """
 
 import argparse
+import asyncio
+import os
+import sys
 import time
-import requests
+import aiohttp
+import orjson
 from pathlib import Path
 
 # SEC EDGAR API requires a User-Agent header
@@ -66,6 +71,9 @@ ALL_COMPANIES = {
     "LIN": "0001707925",    # Linde
 }
 
+# Ticker -> (zero-padded CIK for the submissions API, unpadded CIK for archive URLs)
+_CIK_NORMALIZED = {ticker: (cik, cik.lstrip("0")) for ticker, cik in ALL_COMPANIES.items()}
+
 # Default companies if none specified
 DEFAULT_COMPANIES = ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN"]
 
@@ -74,15 +82,142 @@ YEARS = list(range(2015, 2025))
 
 OUTPUT_DIR = Path("sec_filings")
 
-
-def get_company_filings(cik: str, filing_type: str = "10-K") -> list:
-    """Get list of filings for a company from SEC EDGAR."""
+# ETag / Last-Modified validators per accession, used to revalidate existing files
+VALIDATORS_FILE = OUTPUT_DIR / ".etags.json"
+
+# Company submissions indexes are reused from disk for this many seconds
+SUBMISSIONS_CACHE_DIR = OUTPUT_DIR / ".cache" / "submissions"
+SUBMISSIONS_CACHE_TTL = 24 * 60 * 60
+
+# Concurrent filing downloads, and SEC EDGAR's fair-access limit of 10 requests/second
+MAX_CONCURRENT_DOWNLOADS = 8
+SEC_REQUESTS_PER_SECOND = 10
+
+# Filing bodies are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# Shown after an interactive run
+UPLOAD_HINT = """
+To upload to RAG, run:
+  curl -X POST http://localhost:8082/documents \\
+    -F 'documents=@{path}' \\
+    -F 'data={{"collection_name":"sec_filings"}}'"""
+
+# Transient SEC errors are retried with exponential back-off (0.5s, 1s, 2s, ...)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.5
+# A filing body interrupted mid-stream is requested again up to this many times; each
+# re-request is a single attempt, so sec_get's back-off schedule is never repeated
+MAX_STREAM_RETRIES = 2
+
+# Seconds allowed to open a connection; reads are bounded per read, not per response,
+# so a large filing that keeps streaming is never cut off by an overall deadline
+CONNECT_TIMEOUT = 10
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write via a temporary file and rename, so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class RateLimiter:
+    """Space out request starts so at most `rate` begin per second."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def sec_get(
+    session: aiohttp.ClientSession,
+    limiter: RateLimiter,
+    url: str,
+    timeout: float,
+    headers: dict | None = None,
+    retries: int = MAX_RETRIES,
+) -> aiohttp.ClientResponse:
+    """
+    Rate-limited GET that retries connection errors, timeouts and RETRY_STATUSES
+    up to `retries` times with exponential back-off, honouring a numeric
+    Retry-After header.
+
+    timeout bounds each socket read (including reads of the returned body),
+    not the whole response.
+
+    Returns the response unread; use it as `async with await sec_get(...) as resp`.
+    Other error statuses raise aiohttp.ClientResponseError.
+    """
+    for attempt in range(retries + 1):
+        delay = RETRY_BACKOFF * (2 ** attempt)
+        await limiter.acquire()
+        try:
+            resp = await session.get(
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=CONNECT_TIMEOUT, sock_read=timeout
+                ),
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+        else:
+            if resp.status not in RETRY_STATUSES or attempt == retries:
+                resp.raise_for_status()
+                return resp
+            retry_after = resp.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            resp.release()
+        await asyncio.sleep(delay)
+
+
+async def get_company_filings(
+    session: aiohttp.ClientSession,
+    limiter: RateLimiter,
+    cik: str,
+    years: list,
+    filing_type: str = "10-K",
+) -> list:
+    """
+    Get list of filings of filing_type in the given years for a company from SEC EDGAR.
+
+    The submissions index is cached under SUBMISSIONS_CACHE_DIR and reused
+    for SUBMISSIONS_CACHE_TTL seconds, since it only changes when a new
+    filing is posted.
+    """
     url = f"https://data.sec.gov/submissions/CIK{cik}.json"
+    cache_file = SUBMISSIONS_CACHE_DIR / f"{cik}.json"
 
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
+        try:
+            fresh = time.time() - cache_file.stat().st_mtime < SUBMISSIONS_CACHE_TTL
+        except FileNotFoundError:
+            fresh = False
+
+        if fresh:
+            data = orjson.loads(cache_file.read_bytes())
+        else:
+            async with await sec_get(session, limiter, url, timeout=30) as resp:
+                raw = await resp.read()
+            # Parse before caching so a truncated or non-JSON body is never reused
+            data = orjson.loads(raw)
+            if not isinstance(data, dict):
+                raise ValueError(f"unexpected submissions index from {url}")
+            SUBMISSIONS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            write_atomic(cache_file, raw)
 
         filings = []
         recent = data.get("filings", {}).get("recent", {})
@@ -92,17 +227,22 @@ def get_company_filings(cik: str, filing_type: str = "10-K") -> list:
         accessions = recent.get("accessionNumber", [])
         primary_docs = recent.get("primaryDocument", [])
 
-        for i, form in enumerate(forms):
-            if form == filing_type:
-                year = int(dates[i][:4])
-                if year in YEARS:
-                    filings.append({
-                        "form": form,
-                        "date": dates[i],
-                        "year": year,
-                        "accession": accessions[i].replace("-", ""),
-                        "primary_doc": primary_docs[i],
-                    })
+        # Filter on the string form/year first; large filers have tens of thousands
+        # of entries and only a handful are wanted, so build dicts for matches only.
+        # EDGAR lists recent filings newest-first, so stop once past the oldest year.
+        year_prefixes = {str(year) for year in years}
+        oldest_year = str(min(years))
+        for form, date, accession, primary_doc in zip(forms, dates, accessions, primary_docs):
+            if date[:4] < oldest_year:
+                break
+            if form == filing_type and date[:4] in year_prefixes:
+                filings.append({
+                    "form": form,
+                    "date": date,
+                    "year": int(date[:4]),
+                    "accession": accession.replace("-", ""),
+                    "primary_doc": primary_doc,
+                })
 
         return filings
     except Exception as e:
@@ -110,17 +250,31 @@ def get_company_filings(cik: str, filing_type: str = "10-K") -> list:
         return []
 
 
-def download_filing(cik: str, ticker: str, filing: dict) -> str:
-    """Download a single filing document."""
+async def download_filing(
+    session: aiohttp.ClientSession,
+    limiter: RateLimiter,
+    cik: str,
+    ticker: str,
+    filing: dict,
+    validators: dict,
+    revalidate: bool = False,
+) -> str:
+    """
+    Download a single filing document.
+
+    Existing files are skipped, unless revalidate is set and validators holds
+    an ETag/Last-Modified for the accession; the request is then conditional
+    and a 304 Not Modified keeps the local copy. Validators of new downloads
+    are recorded in validators.
+    """
     accession = filing["accession"]
     primary_doc = filing["primary_doc"]
     year = filing["year"]
 
     url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{primary_doc}"
 
-    # Create output directory
+    # Output directory is created once per ticker by download_companies
     output_dir = OUTPUT_DIR / ticker
-    output_dir.mkdir(parents=True, exist_ok=True)
 
     # Output filename (use .html for compatibility with ingestor)
     ext = Path(primary_doc).suffix or ".html"
@@ -128,22 +282,117 @@ def download_filing(cik: str, ticker: str, filing: dict) -> str:
         ext = ".html"  # Normalize .htm to .html
     output_file = output_dir / f"{ticker}_10K_{year}{ext}"
 
+    request_headers = {}
     if output_file.exists():
-        print(f"  Already exists: {output_file.name}")
-        return str(output_file)
-
+        cached = validators.get(accession)
+        if not (revalidate and cached):
+            print(f"  Already exists: {output_file.name}")
+            return str(output_file)
+        if cached.get("etag"):
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    # Stream into a temporary file so an interrupted download never looks complete
+    partial_file = output_file.with_name(output_file.name + ".part")
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=60)
-        resp.raise_for_status()
-
-        output_file.write_bytes(resp.content)
+        for stream_attempt in range(MAX_STREAM_RETRIES + 1):
+            # Transient request errors are retried inside sec_get on the first request only
+            retries = MAX_RETRIES if stream_attempt == 0 else 0
+            async with await sec_get(
+                session, limiter, url, timeout=60, headers=request_headers, retries=retries
+            ) as resp:
+                if resp.status == 304:
+                    print(f"  Not modified: {output_file.name}")
+                    return str(output_file)
+                try:
+                    with open(partial_file, "wb") as f:
+                        async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    # Stalled or dropped mid-stream: request it again and rewrite the .part file
+                    if stream_attempt == MAX_STREAM_RETRIES:
+                        raise
+                else:
+                    etag = resp.headers.get("ETag")
+                    last_modified = resp.headers.get("Last-Modified")
+                    break
+            await asyncio.sleep(RETRY_BACKOFF)
+
+        partial_file.replace(output_file)
+        if etag or last_modified:
+            validators[accession] = {"etag": etag, "last_modified": last_modified}
         print(f"  Downloaded: {output_file.name}")
         return str(output_file)
     except Exception as e:
+        partial_file.unlink(missing_ok=True)
         print(f"  Error downloading {url}: {e}")
         return None
 
 
+def load_validators() -> dict:
+    """Load saved ETag/Last-Modified validators, or an empty dict."""
+    try:
+        return orjson.loads(VALIDATORS_FILE.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+
+def save_validators(validators: dict):
+    """Persist validators next to the downloaded filings."""
+    if validators:
+        write_atomic(
+            VALIDATORS_FILE,
+            orjson.dumps(validators, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS),
+        )
+
+
+async def download_companies(companies: dict, years: list, revalidate: bool = False) -> list:
+    """
+    Download filings for all companies, with up to MAX_CONCURRENT_DOWNLOADS
+    in flight over one keep-alive session, rate limited to SEC_REQUESTS_PER_SECOND.
+
+    companies maps ticker -> (padded CIK, unpadded CIK), as in _CIK_NORMALIZED.
+    """
+    validators = load_validators()
+    limiter = RateLimiter(SEC_REQUESTS_PER_SECOND)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    connector = aiohttp.TCPConnector(limit_per_host=MAX_CONCURRENT_DOWNLOADS, keepalive_timeout=60)
+
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        # Fetch every company's submissions index concurrently
+        all_filings = await asyncio.gather(
+            *(get_company_filings(session, limiter, cik, years, "10-K") for cik, _ in companies.values())
+        )
+
+        jobs = []
+        for (ticker, (cik, cik_clean)), filings in zip(companies.items(), all_filings):
+            print(f"\n{ticker} (CIK: {cik})")
+            print("-" * 40)
+
+            print(f"Found {len(filings)} 10-K filings in date range")
+
+            if filings:
+                (OUTPUT_DIR / ticker).mkdir(parents=True, exist_ok=True)
+
+            jobs.extend((cik_clean, ticker, filing) for filing in filings)
+
+        async def bounded_download(cik_clean: str, ticker: str, filing: dict):
+            async with semaphore:
+                return await download_filing(
+                    session, limiter, cik_clean, ticker, filing, validators, revalidate
+                )
+
+        if jobs:
+            print(f"\nDownloading {len(jobs)} filings...")
+        try:
+            results = await asyncio.gather(*(bounded_download(*job) for job in jobs))
+        finally:
+            save_validators(validators)
+
+    return [filepath for filepath in results if filepath]
+
+
 def list_companies():
     """Print all available companies."""
     print("Available companies:")
@@ -164,6 +413,7 @@ Examples:
   python download_sec_filings.py BA                 # Download only Boeing
   python download_sec_filings.py BA NVDA AAPL      # Download specific companies
   python download_sec_filings.py --list            # List available companies
+  python download_sec_filings.py --revalidate      # Refresh changed filings
         """,
     )
     parser.add_argument(
@@ -182,6 +432,11 @@ Examples:
         default=None,
         help="Year range (e.g., '2020-2024' or '2023')",
     )
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Re-check existing files with conditional requests and refresh changed ones",
+    )
 
     args = parser.parse_args()
 
@@ -196,8 +451,9 @@ Examples:
         companies = {}
         for ticker in args.companies:
             ticker = ticker.upper()
-            if ticker in ALL_COMPANIES:
-                companies[ticker] = ALL_COMPANIES[ticker]
+            ciks = _CIK_NORMALIZED.get(ticker)
+            if ciks:
+                companies[ticker] = ciks
             else:
                 print(f"Warning: Unknown ticker '{ticker}', skipping.")
                 print(f"  Use --list to see available companies.")
@@ -205,7 +461,7 @@ Examples:
             print("Error: No valid companies specified.")
             return []
     else:
-        companies = {t: ALL_COMPANIES[t] for t in DEFAULT_COMPANIES}
+        companies = {t: _CIK_NORMALIZED[t] for t in DEFAULT_COMPANIES}
 
     # Handle year range
     years = YEARS
@@ -224,41 +480,15 @@ Examples:
 
     OUTPUT_DIR.mkdir(exist_ok=True)
 
-    all_files = []
-
-    for ticker, cik in companies.items():
-        print(f"\n{ticker} (CIK: {cik})")
-        print("-" * 40)
-
-        # Remove leading zeros for API calls
-        cik_clean = cik.lstrip("0")
-
-        filings = get_company_filings(cik, "10-K")
-        # Filter by requested years
-        filings = [f for f in filings if f["year"] in years]
-        print(f"Found {len(filings)} 10-K filings in date range")
-
-        for filing in filings:
-            filepath = download_filing(cik_clean, ticker, filing)
-            if filepath:
-                all_files.append(filepath)
-
-            # Be nice to SEC servers
-            time.sleep(0.5)
-
-        time.sleep(1)  # Pause between companies
+    all_files = asyncio.run(download_companies(companies, years, args.revalidate))
 
     print("\n" + "=" * 60)
     print(f"Downloaded {len(all_files)} files to {OUTPUT_DIR}/")
     print("=" * 60)
 
-    # Print upload instructions
-    if all_files:
-        first_ticker = list(companies.keys())[0]
-        print("\nTo upload to RAG, run:")
-        print(f"  curl -X POST http://localhost:8082/documents \\")
-        print(f"    -F 'documents=@{all_files[0]}' \\")
-        print(f"    -F 'data={{\"collection_name\":\"sec_filings\"}}'")
+    # Print upload instructions for interactive runs only
+    if all_files and sys.stdout.isatty():
+        print(UPLOAD_HINT.format(path=all_files[0]))
 
     return all_files
 
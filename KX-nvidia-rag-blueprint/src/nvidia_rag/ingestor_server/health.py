@@ -428,8 +428,8 @@ async def check_all_services_health(vdb_op: VDBRag) -> dict[str, list[dict[str,
     )
 
     # Execute all health checks concurrently
-    for category, task in tasks:
-        result = await task
+    task_results = await asyncio.gather(*(task for _, task in tasks))
+    for (category, _), result in zip(tasks, task_results):
         results[category].append(result)
 
     return results
@@ -53,10 +53,48 @@ KDB.AI Filter Format Reference:
 
 import logging
 import re
+from functools import lru_cache
 from typing import Any, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Number of distinct filter expressions whose translation is memoized
+FILTER_CACHE_SIZE = 1024
+
+# Patterns are compiled once at import; filters are translated on every search.
+# Split by 'and' or '&&' for multiple conditions
+_AND_SPLIT_PATTERN = re.compile(r"\s+and\s+|\s*&&\s*", re.IGNORECASE)
+# A single condition, as one alternation tried in priority order so each
+# condition is matched in one pass; the outer named group that matched
+# (match.lastgroup) identifies the form. Only the 'in'/'like' keywords are
+# affected by IGNORECASE.
+_CONDITION_PATTERN = re.compile(
+    # Nested field access: source['source_name'] == 'value'
+    r"(?P<nested>(?P<nested_field>\w+)\[(?P<nested_key_quote>['\"])\w+(?P=nested_key_quote)\]"
+    r"\s*(?P<nested_op>==|!=|>|<|>=|<=)\s*(?P<nested_quote>['\"])(?P<nested_value>[^'\"]+)(?P=nested_quote))"
+    # Simple equality: field == 'value' or field == "value"
+    r"|(?P<equality>(?P<equality_field>\w+)\s*(?P<equality_op>==|!=)"
+    r"\s*(?P<equality_quote>['\"])(?P<equality_value>[^'\"]+)(?P=equality_quote))"
+    # Numeric comparison: field > 10, field <= 100.5
+    r"|(?P<numeric>(?P<numeric_field>\w+)\s*(?P<numeric_op>>|<|>=|<=|==|!=)\s*(?P<numeric_value>-?\d+\.?\d*))"
+    # 'in' operator: field in ['a', 'b', 'c']
+    r"|(?P<in>(?P<in_field>\w+)\s+in\s+\[(?P<in_values>[^\]]+)\])"
+    # 'like' operator: field like '%pattern%'
+    r"|(?P<like>(?P<like_field>\w+)\s+like\s+(?P<like_quote>['\"])(?P<like_value>[^'\"]+)(?P=like_quote))",
+    re.IGNORECASE,
+)
+# List values: quoted strings or numbers
+_LIST_VALUE_PATTERN = re.compile(r"(['\"])([^'\"]+)\1|(-?\d+\.?\d*)")
+
+_OPERATOR_MAP = {
+    "==": "=",
+    "!=": "<>",
+    ">": ">",
+    "<": "<",
+    ">=": ">=",
+    "<=": "<=",
+}
+
 
 def milvus_to_kdbai_filter(
     filter_expr: str,
@@ -83,11 +121,36 @@ def milvus_to_kdbai_filter(
     if not filter_expr or not filter_expr.strip():
         return None
 
-    filter_expr = filter_expr.strip()
+    conditions = _translate_filter(filter_expr.strip())
+    if conditions is None:
+        return None
+
+    # Hand out fresh lists so callers cannot mutate the cached translation
+    return [
+        (op, field, list(value)) if op == "in" else (op, field, value)
+        for op, field, value in conditions
+    ]
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _translate_filter(filter_expr: str) -> Optional[tuple]:
+    """
+    Translate a stripped, non-empty filter expression to a tuple of conditions.
+
+    Memoized: the same filters (UI facets, LLM-generated filters within a
+    session) recur across queries. Unparseable expressions are therefore
+    only logged the first time they are seen.
+    """
+    # Most filters are a single condition; skip the split when no separator
+    # can be present ("and" is matched case-insensitively by the split)
+    if "&&" not in filter_expr and "and" not in filter_expr.lower():
+        condition = _parse_single_condition(filter_expr)
+        return (condition,) if condition else None
+
     conditions = []
 
     # Split by 'and' or '&&' for multiple conditions
-    parts = re.split(r"\s+and\s+|\s*&&\s*", filter_expr, flags=re.IGNORECASE)
+    parts = _AND_SPLIT_PATTERN.split(filter_expr)
 
     for part in parts:
         part = part.strip()
@@ -101,20 +164,12 @@ def milvus_to_kdbai_filter(
     if not conditions:
         return None
 
-    return conditions
+    return tuple(conditions)
 
 
 def _convert_operator(op: str) -> str:
     """Convert Milvus operator to KDB.AI operator."""
-    operator_map = {
-        "==": "=",
-        "!=": "<>",
-        ">": ">",
-        "<": "<",
-        ">=": ">=",
-        "<=": "<=",
-    }
-    return operator_map.get(op, op)
+    return _OPERATOR_MAP.get(op, op)
 
 
 def _parse_single_condition(expr: str) -> Optional[tuple]:
@@ -129,56 +184,38 @@ def _parse_single_condition(expr: str) -> Optional[tuple]:
     """
     expr = expr.strip()
 
-    # Pattern for nested field access: source['source_name'] == 'value'
-    nested_pattern = r"(\w+)\[(['\"])(\w+)\2\]\s*(==|!=|>|<|>=|<=)\s*(['\"])([^'\"]+)\5"
-    match = re.match(nested_pattern, expr)
-    if match:
+    match = _CONDITION_PATTERN.match(expr)
+    kind = match.lastgroup if match else None
+
+    if kind == "nested":
         # For KDB.AI, we simplify nested access to just the field name
         # since metadata is stored as JSON string
-        field = match.group(1)  # Use parent field name
-        operator = _convert_operator(match.group(4))
-        value = match.group(6)
-        return (operator, field, value)
-
-    # Pattern for simple equality: field == 'value' or field == "value"
-    equality_pattern = r"(\w+)\s*(==|!=)\s*(['\"])([^'\"]+)\3"
-    match = re.match(equality_pattern, expr)
-    if match:
-        field = match.group(1)
-        operator = _convert_operator(match.group(2))
-        value = match.group(4)
-        return (operator, field, value)
-
-    # Pattern for numeric comparison: field > 10, field <= 100.5
-    numeric_pattern = r"(\w+)\s*(>|<|>=|<=|==|!=)\s*(-?\d+\.?\d*)"
-    match = re.match(numeric_pattern, expr)
-    if match:
-        field = match.group(1)
-        operator = _convert_operator(match.group(2))
-        value_str = match.group(3)
+        field = match["nested_field"]  # Use parent field name
+        operator = _convert_operator(match["nested_op"])
+        return (operator, field, match["nested_value"])
+
+    if kind == "equality":
+        field = match["equality_field"]
+        operator = _convert_operator(match["equality_op"])
+        return (operator, field, match["equality_value"])
+
+    if kind == "numeric":
+        field = match["numeric_field"]
+        operator = _convert_operator(match["numeric_op"])
+        value_str = match["numeric_value"]
         # Convert to appropriate numeric type
         value = float(value_str) if "." in value_str else int(value_str)
         return (operator, field, value)
 
-    # Pattern for 'in' operator: field in ['a', 'b', 'c']
-    in_pattern = r"(\w+)\s+in\s+\[([^\]]+)\]"
-    match = re.match(in_pattern, expr, re.IGNORECASE)
-    if match:
-        field = match.group(1)
-        values_str = match.group(2)
+    if kind == "in":
         # Parse the values list
-        values = _parse_list_values(values_str)
+        values = _parse_list_values(match["in_values"])
         if values:
-            return ("in", field, values)
-
-    # Pattern for 'like' operator: field like '%pattern%'
-    like_pattern = r"(\w+)\s+like\s+(['\"])([^'\"]+)\2"
-    match = re.match(like_pattern, expr, re.IGNORECASE)
-    if match:
-        field = match.group(1)
-        pattern = match.group(3)
+            return ("in", match["in_field"], values)
+
+    if kind == "like":
         # KDB.AI uses 'like' with wildcards
-        return ("like", field, pattern)
+        return ("like", match["like_field"], match["like_value"])
 
     logger.warning(f"Could not parse filter expression: {expr}")
     return None
@@ -196,9 +233,7 @@ def _parse_list_values(values_str: str) -> List[Any]:
     """
     values = []
     # Match quoted strings or numbers
-    pattern = r"(['\"])([^'\"]+)\1|(-?\d+\.?\d*)"
-
-    for match in re.finditer(pattern, values_str):
+    for match in _LIST_VALUE_PATTERN.finditer(values_str):
         if match.group(2):  # Quoted string
             values.append(match.group(2))
         elif match.group(3):  # Number
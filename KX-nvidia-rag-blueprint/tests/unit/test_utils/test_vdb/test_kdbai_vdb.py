@@ -62,6 +62,37 @@ class TestKdbaiFilters:
         result = milvus_to_kdbai_filter("category in ['A', 'B', 'C']")
         assert result == [("in", "category", ["A", "B", "C"])]
 
+    def test_milvus_to_kdbai_filter_like_operator(self):
+        """Test 'like' operator filter, case-insensitive keyword."""
+        from nvidia_rag.utils.vdb.kdbai.kdbai_filters import milvus_to_kdbai_filter
+
+        result = milvus_to_kdbai_filter("source LIKE '*report*'")
+        assert result == [("like", "source", "*report*")]
+
+    def test_milvus_to_kdbai_filter_multiple_conditions(self):
+        """Test mixed conditions joined by 'and' / '&&'."""
+        from nvidia_rag.utils.vdb.kdbai.kdbai_filters import milvus_to_kdbai_filter
+
+        result = milvus_to_kdbai_filter(
+            "source['source_name'] != \"a.pdf\" and count <= -2.5 && tag in ['x', 1]"
+        )
+        assert result == [
+            ("<>", "source", "a.pdf"),
+            ("<=", "count", -2.5),
+            ("in", "tag", ["x", 1]),
+        ]
+
+    def test_milvus_to_kdbai_filter_cached_result_is_independent(self):
+        """Test repeated translations are cached but return fresh lists."""
+        from nvidia_rag.utils.vdb.kdbai.kdbai_filters import milvus_to_kdbai_filter
+
+        first = milvus_to_kdbai_filter("category in ['A', 'B'] and count > 1")
+        first[0][2].append("C")
+        first.append(("=", "extra", 1))
+
+        second = milvus_to_kdbai_filter("category in ['A', 'B'] and count > 1")
+        assert second == [("in", "category", ["A", "B"]), (">", "count", 1)]
+
     def test_milvus_to_kdbai_filter_empty(self):
         """Test empty filter expression."""
         from nvidia_rag.utils.vdb.kdbai.kdbai_filters import milvus_to_kdbai_filter